@@ -1,49 +1,297 @@
+import csv
+import gzip
+import io
+import json
 import os
+import threading
+import time
 import uuid
 from datetime import datetime
 from math import isnan
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
-from firestore_client import get_client
+from storage import get_storage
+from curriculum_cache import CurriculumCache
+import curriculum_snapshot
+from content_cache import ContentIndex
+from lru import LRUCache
+from mastery import compute_mastered_batch, compute_mastered_from_scores, student_mastered
+import dashboard_stats
+import path_jobs
+import metrics
+from metrics import stage
 from graph_service import (
+    CurriculumIndex,
+    ReachabilityIndex,
+    assign_levels_to_graph,
     build_graph_from_topics,
-    recommend_next_topics,
+    topological_order,
     validate_dag,
+    find_cycle_from_edit,
     nodes_with_titles,
 )
 from flask import abort
 
 app = Flask(__name__)
 CORS(app)
-
-db = get_client()
-
-def compute_mastered_from_scores(scores: dict, finals: dict, threshold: float = 0.5):
+# per-route latency and /metrics; SERVER_TIMING=1 adds a Server-Timing header
+metrics.init_app(app, server_timing=os.getenv("SERVER_TIMING", "0") == "1")
+
+db = get_storage()
+
+def _load_topic_docs():
+    with stage("firestore_read"):
+        return [{"id": d.id, **d.to_dict()} for d in db.topics.stream()]
+
+def _build_graph(docs):
+    with stage("graph_build"):
+        return build_graph_from_topics(docs)
+
+def _stored_curriculum_version():
+    with stage("firestore_read"):
+        return curriculum_snapshot.stored_version(db)
+
+CURRICULUM_CACHE_TTL = float(os.getenv("CURRICULUM_CACHE_TTL", 300) or 0)
+
+# CURRICULUM_SNAPSHOT names a file written by `python curriculum_snapshot.py export`;
+# it is opened at startup and serves the curriculum until the stored version moves past
+# it or, checked once per TTL, its topics no longer match the stored ones
+CURRICULUM_SNAPSHOT = os.getenv("CURRICULUM_SNAPSHOT", "")
+snapshot_source = None
+if CURRICULUM_SNAPSHOT:
+    snapshot_source = curriculum_snapshot.SnapshotSource(
+        CURRICULUM_SNAPSHOT, _stored_curriculum_version, load_docs=_load_topic_docs,
+        build=_build_graph, verify_after=CURRICULUM_CACHE_TTL)
+    snapshot_source.load()
+
+# graph is built once and rebuilt after topic writes. Other python workers and
+# sync_topics move meta/curriculum, which is checked every CURRICULUM_VERSION_CHECK
+# seconds; CURRICULUM_CACHE_TTL (seconds) bounds staleness for writes that do not
+# (the node backend, console edits)
+curriculum = CurriculumCache(_load_topic_docs, ttl=CURRICULUM_CACHE_TTL,
+                             build=_build_graph, source=snapshot_source,
+                             stamp=_stored_curriculum_version,
+                             check_interval=float(os.getenv("CURRICULUM_VERSION_CHECK", 5)))
+
+def _load_content_docs():
+    with stage("firestore_read"):
+        return [{"id": d.id, **d.to_dict()} for d in db.contents.stream()]
+
+# contents grouped by topic_id; dropped by the content write endpoints. The node
+# backend also writes contents (and cascades deletes from topics), so CONTENT_CACHE_TTL
+# (seconds) bounds how long other writers' changes can go unseen
+content_index = ContentIndex(_load_content_docs, ttl=float(os.getenv("CONTENT_CACHE_TTL", 60) or 0))
+
+# login lookups: id -> {"name", "role"}; dropped by student writes and deletes
+identity_cache = LRUCache(maxsize=int(os.getenv("LOGIN_CACHE_SIZE", 4096)),
+                          ttl=float(os.getenv("LOGIN_CACHE_TTL", 300) or 0))
+metrics.register_cache("login", identity_cache)
+
+# how many cycles to report when the stored curriculum is not a DAG
+CYCLE_REPORT_LIMIT = int(os.getenv("CYCLE_REPORT_LIMIT", 10))
+
+def _curriculum_cycles(snap):
+    # upsert_topic rejects edits that would close a cycle, so this only trips on data
+    # written around the API (seed scripts, console edits); checked once per version
+    def check(s):
+        with stage("validate"):
+            return validate_dag(s.graph, max_cycles=CYCLE_REPORT_LIMIT)
+    return snap.derive("cycles", check)
+
+def _wants_gzip():
+    return request.accept_encodings["gzip"] > 0
+
+def _curriculum_response(render, gzip_variant=False):
     """
-    Return list of topic_ids considered mastered based on scores and finals.
-    threshold: fraction (0.5 = half of final)
+    Serve a curriculum read from the cached snapshot with ETag/Last-Modified.
+    A matching If-None-Match gets a 304 before render runs, so revalidation never
+    touches Firestore or rebuilds anything. (Last-Modified is informational only:
+    its one-second resolution cannot tell apart two edits in the same second.)
+    gzip_variant: render may gzip the body (_precomputed_json); the gzip and identity
+    bodies then get different ETags and every response, 304s included, varies on
+    Accept-Encoding.
     """
-    mastered = []
-    for topic_id, sc in (scores or {}).items():
-        try:
-            sc_val = float(sc)
-        except Exception:
-            continue
-        max_sc = None
-        if finals and topic_id in finals:
-            try:
-                max_sc = float(finals[topic_id])
-            except Exception:
-                max_sc = None
-        # if no topic-specific final, don't assume global final unless provided elsewhere
-        if max_sc is None:
-            # skip if no max known (cannot decide)
-            continue
-        if max_sc > 0 and sc_val >= (threshold * max_sc):
-            mastered.append(topic_id)
-    # unique
-    return list(dict.fromkeys(mastered))
+    snap = curriculum.snapshot()
+    etag = snap.etag + ("-gz" if gzip_variant and _wants_gzip() else "")
+    if request.if_none_match.contains_weak(etag):
+        resp = app.response_class(status=304)
+    else:
+        resp = app.make_response(render(snap))
+        if resp.status_code != 200:
+            return resp
+    if gzip_variant:
+        resp.vary.add("Accept-Encoding")
+    resp.set_etag(etag)
+    resp.last_modified = datetime.utcfromtimestamp(int(snap.loaded_at))
+    # let clients cache but always revalidate
+    resp.cache_control.no_cache = True
+    return resp
+
+def _encoded_json(snap, key, build):
+    # (status, JSON bytes) of build(snap) -> (payload, status), once per curriculum version
+    def encode(s):
+        payload, status = build(s)
+        return status, json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return snap.derive(key, encode)
+
+def _precomputed_json(snap, key, build):
+    """
+    Response for a payload that only depends on the curriculum.
+    build(snap) -> (payload, status) runs once per curriculum version; the encoded
+    JSON bytes (and a gzipped copy, made on first use) are reused until topics change.
+    """
+    status, body = _encoded_json(snap, key, build)
+    gzipped = _wants_gzip()
+    if gzipped:
+        body = snap.derive(key + ".gz", lambda s: gzip.compress(body))
+    resp = app.response_class(body, status=status, mimetype="application/json")
+    if gzipped:
+        resp.headers["Content-Encoding"] = "gzip"
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+def _topo_order(snap):
+    # precomputed when the snapshot came from a snapshot file; raises ValueError on cycles
+    return snap.derive("topo_order", lambda s: topological_order(s.graph))
+
+def _levels(snap):
+    # node levels for the graph details payload (also precomputed in snapshot files)
+    return snap.derive("levels", lambda s: assign_levels_to_graph(s.graph))
+
+def _curriculum_index(snap):
+    # compact form used for recommendations; raises ValueError if the graph is not a DAG
+    def build(s):
+        order = _topo_order(s)
+        with stage("graph_build"):
+            return CurriculumIndex(s.graph, order=order)
+    return snap.derive("index", build)
+
+# recommendations by (curriculum version, mastered set, limit); students with the
+# same mastered set share one entry, and everything is dropped when topics change
+recommendation_cache = LRUCache(maxsize=int(os.getenv("RECOMMEND_CACHE_SIZE", 10000)))
+metrics.register_cache("recommendations", recommendation_cache)
+curriculum.add_listener(lambda version: recommendation_cache.clear())
+
+def _recommend(snap, mastered, limit=10):
+    """
+    CurriculumIndex.recommend through recommendation_cache.
+    Raises ValueError if the curriculum is not a DAG.
+    """
+    key = (snap.version, frozenset(mastered), limit)
+    rec_ids = recommendation_cache.get(key)
+    if rec_ids is None:
+        index = _curriculum_index(snap)
+        with stage("recommend"):
+            rec_ids = tuple(index.recommend(mastered, limit=limit))
+        recommendation_cache.put(key, rec_ids)
+    return list(rec_ids)
+
+def _reachability(snap):
+    # transitive closure bitsets; raises ValueError if the graph is not a DAG
+    def build(s):
+        with stage("graph_build"):
+            return ReachabilityIndex(_curriculum_index(s))
+    return snap.derive("reachability", build)
+
+# writes per batched commit in bulk endpoints
+BULK_WRITE_CHUNK = int(os.getenv("BULK_WRITE_CHUNK", 400))
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+# page size cap for ?limit= on the list endpoints
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", 1000))
+
+# only the fields the list endpoints actually return
+STUDENT_LIST_FIELDS = ["name", "score", "final", "scores.general", "finals.general"]
+
+def _page_args():
+    """
+    Optional cursor pagination from ?limit=N&after=<last id>.
+    Returns (limit, after); limit is None when the client did not ask for a page.
+    Raises ValueError on a bad limit.
+    """
+    if request.args.get("limit") is None:
+        return None, None
+    limit = int(request.args["limit"])
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return min(limit, MAX_PAGE_SIZE), request.args.get("after")
+
+def _list_query(collection, fields=None):
+    """
+    Query for a list endpoint: server-side field projection plus optional cursor
+    pagination (document id order). Returns (query, limit); raises ValueError on a bad limit.
+    """
+    query = db.collection(collection)
+    if fields:
+        query = query.select(fields)
+    limit, after = _page_args()
+    if limit is None:
+        return query, None
+    query = query.order_by("__name__")
+    if after:
+        query = query.start_after({"__name__": after})
+    return query.limit(limit), limit
+
+def _list_response(items, limit):
+    # unpaginated requests keep the plain array response
+    if limit is None:
+        return jsonify(items)
+    next_after = items[-1]["id"] if len(items) == limit else None
+    return jsonify({"items": items, "next_after": next_after})
+
+# cold-start warm-up: WARM_UP=1 (default) starts it when the module is imported
+_warm_state = {"ready": False, "error": None, "seconds": None, "thread": None}
+_warm_lock = threading.Lock()
+
+def warm_up():
+    """
+    Build what the first requests would otherwise pay for: the curriculum snapshot
+    with its cycle check, recommendation and reachability indexes, topic details,
+    topic list rows and encoded graph details payload, plus the content index.
+    """
+    snap = curriculum.snapshot()
+    if not _curriculum_cycles(snap):
+        _reachability(snap)
+    snap.derive("topic_details", _topic_details)
+    snap.derive("topic_rows", _topic_rows)
+    _encoded_json(snap, "graph_details", _graph_details_payload)
+    snap.etag  # content hash behind the curriculum ETags
+    snap.graph_tag  # structure hash stored paths are checked against
+    content_index.preload()
+
+def _run_warm_up():
+    start = time.perf_counter()
+    try:
+        warm_up()
+    except Exception as e:
+        # stays not ready; the next /ready call tries again
+        print("warm-up error:", e)
+        _warm_state["error"] = str(e)
+        return
+    _warm_state.update(ready=True, error=None, seconds=round(time.perf_counter() - start, 3))
 
+def start_warm_up():
+    """
+    Run warm_up() in a background thread unless it already ran or is running.
+    """
+    with _warm_lock:
+        thread = _warm_state["thread"]
+        if _warm_state["ready"] or (thread is not None and thread.is_alive()):
+            return
+        thread = threading.Thread(target=_run_warm_up, name="warm-up", daemon=True)
+        _warm_state["thread"] = thread
+        thread.start()
+
+@app.route("/ready")
+def ready():
+    # readiness probe: 503 until the warm-up has finished
+    if _warm_state["ready"]:
+        return jsonify({"ready": True, "warm_up_seconds": _warm_state["seconds"]})
+    start_warm_up()
+    return jsonify({"ready": False, "error": _warm_state["error"]}), 503
 
 @app.route("/")
 def home():
@@ -51,81 +299,54 @@ def home():
 
 @app.route("/dashboard/summary", methods=["GET"])
 def dashboard_summary():
-    # Students
-    snaps = db.collection("students").stream()
-    students = []
-    pass_count, fail_count = 0, 0
-    for d in snaps:
-        doc = d.to_dict()
-        total_score = doc.get("score") or (doc.get("scores", {}).get("general") if doc.get("scores") else 0)
-        total_final = doc.get("final") or (doc.get("finals", {}).get("general") if doc.get("finals") else 0)
-        status = ""
-        if total_final:
-            status = "PASS" if total_score >= (total_final / 2) else "FAIL"
-        if status == "PASS": pass_count += 1
-        elif status == "FAIL": fail_count += 1
-        students.append({
-            "id": d.id,
-            "name": doc.get("name"),
-            "score": total_score,
-            "final": total_final,
-            "status": status
-        })
-
-    # Topics
-    topics_ref = db.collection("topics")
-    topic_docs = list(topics_ref.stream())
-    topic_count = len(topic_docs)
-
-    return jsonify({
-        "students_total": len(students),
-        "students_pass": pass_count,
-        "students_fail": fail_count,
-        "topic_count": topic_count,
-    })
+    # counters are kept up to date by the write endpoints (see dashboard_stats)
+    with stage("firestore_read"):
+        summary = dashboard_stats.read_summary(db)
+    return jsonify(summary)
 
 @app.route("/topics")
 def get_topics():
-    topics_ref = db.collection("topics").stream()
-    topics = []
-    for doc in topics_ref:
-        data = doc.to_dict()
-        topics.append({
-            "id": data.get("id"),
-            "name": data.get("name"),
-            "description": data.get("description"),
-            "prerequisites": data.get("prerequisites", [])
-        })
-    return jsonify(topics)
+    def render(snap):
+        return jsonify([{
+            "id": t.get("id"),
+            "name": t.get("name"),
+            "description": t.get("description"),
+            "prerequisites": t.get("prerequisites", [])
+        } for t in snap.docs])
+    return _curriculum_response(render)
 
 @app.route("/topics/graph")
 def get_graph():
-    topics_ref = db.collection("topics")
-    docs = [{"id": d.id, **d.to_dict()} for d in topics_ref.stream()]
-    G = build_graph_from_topics(docs)
-    return jsonify({
-        "nodes": list(G.nodes),
-        "edges": list(G.edges),
-        "count": len(G.nodes)
-    })
+    def render(snap):
+        G = snap.graph
+        return jsonify({
+            "nodes": list(G.nodes),
+            "edges": list(G.edges),
+            "count": len(G.nodes)
+        })
+    return _curriculum_response(render)
 
 @app.route("/topics/graph/details", methods=["GET"])
 def topics_graph_details():
-    topics_ref = db.collection("topics")
-    docs = [{"id": d.id, **d.to_dict()} for d in topics_ref.stream()]
-    G = build_graph_from_topics(docs)
-    
-    cycles = validate_dag(G)
+    return _curriculum_response(_render_graph_details, gzip_variant=True)
+
+def _render_graph_details(snap):
+    return _precomputed_json(snap, "graph_details", _graph_details_payload)
+
+def _graph_details_payload(snap):
+    G = snap.graph
+
+    cycles = _curriculum_cycles(snap)
     if cycles:
-        return jsonify({"error": "Graph has cycles", "cycles": cycles}), 500
-    
-    # assign levels (new)
+        return {"error": "Graph has cycles", "cycles": cycles}, 500
+
+    # levels are computed once per curriculum version
     try:
-        from graph_service import assign_levels_to_graph
-        assign_levels_to_graph(G)
+        levels = _levels(snap)
     except Exception as e:
         # if something goes wrong with levels, continue but log
         print("assign_levels error:", e)
+        levels = {}
 
     # produce nodes with metadata (title/description/cluster/level)
     nodes = []
@@ -136,27 +357,83 @@ def topics_graph_details():
             "title": node_data.get("name") or node_data.get("title") or n,
             "description": node_data.get("description", ""),
             "cluster": node_data.get("cluster", ""),
-            "level": node_data.get("level", 0)
+            "level": levels.get(n, 0)
         })
 
     edges = [list(e) for e in G.edges()]
-    return jsonify({"nodes": nodes, "edges": edges, "count": len(nodes)})
+    return {"nodes": nodes, "edges": edges, "count": len(nodes)}, 200
+
+def _topic_rows(snap):
+    # /topics/list rows in document id order (the order the cursor pages in)
+    return [{
+        "id": t["id"],
+        "name": t.get("name"),
+        "description": t.get("description"),
+        "prerequisites": t.get("prerequisites", []),
+        "cluster": t.get("cluster", "Uncategorized")
+    } for t in sorted(snap.docs, key=lambda t: t["id"])]
 
 # GET list of topics
 @app.route("/topics/list", methods=["GET"])
 def list_topics():
-    snaps = db.collection("topics").stream()
-    out = []
-    for d in snaps:
-        doc = d.to_dict()
-        out.append({
-            "id": d.id,
-            "name": doc.get("name"),
-            "description": doc.get("description"),
-            "prerequisites": doc.get("prerequisites", []),
-            "cluster": doc.get("cluster", "Uncategorized")
-        })
-    return jsonify(out)
+    try:
+        limit, after = _page_args()
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+
+    def render(snap):
+        rows = snap.derive("topic_rows", _topic_rows)
+        if limit is None:
+            return _list_response(rows, None)
+        if after:
+            rows = [r for r in rows if r["id"] > after]
+        return _list_response(rows[:limit], limit)
+    return _curriculum_response(render)
+
+# stored student paths are computed for this limit (the /path default)
+PATH_LIMIT = 10
+# PATH_JOBS=0 turns off the background refresh after topic edits
+PATH_JOBS_ENABLED = os.getenv("PATH_JOBS", "1") == "1"
+
+path_job_runner = path_jobs.PathJobRunner(
+    db, curriculum.snapshot, student_mastered,
+    lambda snap, mastered, limit: _recommend(snap, mastered, limit=limit),
+    limit=PATH_LIMIT, chunk_size=BULK_WRITE_CHUNK)
+
+def _topic_position(topic_id):
+    # (prerequisites, is a starting topic) in the current graph; (None, False) if absent
+    G = curriculum.graph()
+    if topic_id not in G:
+        return None, False
+    prereqs = set(G.predecessors(topic_id))
+    return prereqs, not prereqs
+
+def _refresh_paths(topic_id, before):
+    """
+    Queue the stored-path refresh for a topic change; returns the job id (or None).
+    """
+    if not PATH_JOBS_ENABLED:
+        return None
+    old_prereqs, was_root = before
+    return path_job_runner.submit(topic_id, old_prereqs, was_root).id
+
+@app.route("/jobs/paths", methods=["GET"])
+def list_path_jobs():
+    return jsonify([job.to_dict() for job in path_job_runner.recent()])
+
+@app.route("/jobs/paths/<job_id>", methods=["GET"])
+def get_path_job(job_id):
+    job = path_job_runner.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+def _student_recommendations(snap, student, mastered, limit):
+    # stored path when it was computed for this mastered set, limit and graph
+    rec_ids = path_jobs.stored_path(student, mastered, limit, snap.graph_tag)
+    if rec_ids is not None:
+        return rec_ids
+    return _recommend(snap, mastered, limit=limit)
 
 # Create or update a topic
 @app.route("/topics/<topic_id>", methods=["POST"])
@@ -168,19 +445,59 @@ def upsert_topic(topic_id):
             allowed[k] = body[k]
     if not allowed:
         return jsonify({"error": "No valid fields provided"}), 400
-    db.collection("topics").document(topic_id).set(allowed, merge=True)
-    return jsonify({"message": f"Topic {topic_id} saved"}), 201
+
+    if "prerequisites" in allowed:
+        prereqs = allowed["prerequisites"] or []
+        if not isinstance(prereqs, list) or not all(isinstance(p, str) and p for p in prereqs):
+            return jsonify({"error": "prerequisites must be a list of topic ids"}), 400
+        # null is stored as [] so the graph build never sees it
+        allowed["prerequisites"] = prereqs
+        # reject edits that would close a cycle so the stored curriculum stays a DAG
+        G = curriculum.graph()
+        with stage("validate"):
+            cycle = find_cycle_from_edit(G, topic_id, prereqs)
+        if cycle:
+            return jsonify({"error": "Prerequisites would create a cycle", "cycle": cycle}), 409
+
+    topic_ref = db.topics.document(topic_id)
+    existed = topic_ref.get().exists
+    before = _topic_position(topic_id)
+    # the stored curriculum version moves in the same commit (see curriculum_snapshot)
+    batch = db.batch()
+    batch.set(topic_ref, allowed, merge=True)
+    curriculum_snapshot.bump_version(db, batch)
+    batch.commit()
+    curriculum.invalidate()
+    out = {"message": f"Topic {topic_id} saved"}
+    if "prerequisites" in allowed or not existed:
+        out["path_job"] = _refresh_paths(topic_id, before)
+    return jsonify(out), 201
 
 # Delete a topic
 @app.route("/topics/<topic_id>", methods=["DELETE"])
 def delete_topic(topic_id):
-    db.collection("topics").document(topic_id).delete()
-    return jsonify({"message": f"Topic {topic_id} deleted"}), 200
+    topic_ref = db.topics.document(topic_id)
+    existed = topic_ref.get().exists
+    before = _topic_position(topic_id)
+    batch = db.batch()
+    batch.delete(topic_ref)
+    curriculum_snapshot.bump_version(db, batch)
+    batch.commit()
+    curriculum.invalidate()
+    out = {"message": f"Topic {topic_id} deleted"}
+    if existed:
+        out["path_job"] = _refresh_paths(topic_id, before)
+    return jsonify(out), 200
 
 # Delete student
 @app.route("/students/<student_id>", methods=["DELETE"])
 def delete_student(student_id):
-    db.collection("students").document(student_id).delete()
+    doc_ref = db.students.document(student_id)
+    snap = doc_ref.get()
+    doc_ref.delete()
+    identity_cache.invalidate(student_id)
+    if snap.exists:
+        dashboard_stats.apply_delta(db, dashboard_stats.student_delta(snap.to_dict(), None))
     return jsonify({"message": f"Student {student_id} deleted"}), 200
 
 @app.route("/students/<student_id>/scores", methods=["POST"])
@@ -190,8 +507,13 @@ def update_student_scores(student_id):
     {
       "scores": { "topic_id": number, ... },
       "finals": { "topic_id": number, ... },        # optional
-      "threshold": 0.5                             # optional, fraction
+      "threshold": 0.5,                            # optional, fraction
+      "transactional": false                       # optional, see below
     }
+    The write only touches the posted score/final entries and adds to mastered with
+    ArrayUnion, so concurrent updates for other topics are never overwritten. With
+    "transactional": true the read and write run in one transaction instead, and the
+    returned mastered list is exactly what was stored.
     """
     body = request.get_json() or {}
     scores = body.get("scores", {}) or {}
@@ -201,44 +523,84 @@ def update_student_scores(student_id):
     except Exception:
         threshold = 0.5
 
-    doc_ref = db.collection("students").document(student_id)
-    snap = doc_ref.get()
-    existing = snap.to_dict() if snap.exists else {}
-
-    # merge scores & finals (existing values preserved unless overwritten)
-    merged_scores = dict(existing.get("scores", {}) or {})
-    merged_scores.update(scores)
-
-    merged_finals = dict(existing.get("finals", {}) or {})
-    merged_finals.update(finals)
-
-    # compute mastered topics from merged data
-    computed_mastered = compute_mastered_from_scores(merged_scores, merged_finals, threshold)
+    def merge(existing):
+        # merge scores & finals (existing values preserved unless overwritten)
+        merged_scores = dict(existing.get("scores", {}) or {})
+        merged_scores.update(scores)
 
-    # merge with explicit existing mastered (preserve teacher-validated mastered)
-    existing_mastered = list(existing.get("mastered", []) or [])
-    # combine preserving unique order (existing first)
-    new_mastered = list(dict.fromkeys(existing_mastered + computed_mastered))
+        merged_finals = dict(existing.get("finals", {}) or {})
+        merged_finals.update(finals)
 
-    # write back
-    doc_ref.set({
-        "scores": merged_scores,
-        "finals": merged_finals,
-        "mastered": new_mastered
-    }, merge=True)
+        # compute mastered topics from merged data
+        computed_mastered = compute_mastered_from_scores(merged_scores, merged_finals, threshold)
 
-    # Build the graph & recommend next topics
-    topics_ref = db.collection("topics")
-    docs = [{"id": d.id, **d.to_dict()} for d in topics_ref.stream()]
-    G = build_graph_from_topics(docs)
+        # merge with explicit existing mastered (preserve teacher-validated mastered)
+        existing_mastered = list(existing.get("mastered", []) or [])
+        # combine preserving unique order (existing first)
+        new_mastered = list(dict.fromkeys(existing_mastered + computed_mastered))
+        return merged_scores, merged_finals, computed_mastered, new_mastered
 
-    # validate DAG and compute recommended (reuse your function)
-    try:
-        rec_ids = recommend_next_topics(G, new_mastered, limit=10)
-    except Exception as e:
-        return jsonify({"error": "Recommendation error", "details": str(e)}), 500
+    # recommendations are stored with the write (see path_jobs); None when they fail
+    curriculum_snap = curriculum.snapshot()
+    graph_tag = curriculum_snap.graph_tag
+    def recommend(mastered):
+        try:
+            return _recommend(curriculum_snap, mastered, limit=PATH_LIMIT), None
+        except Exception as e:
+            return None, e
+
+    doc_ref = db.students.document(student_id)
+    if _transactional_requested(body):
+        @db.transactional
+        def write(transaction):
+            snap = doc_ref.get(transaction=transaction)
+            before = snap.to_dict() if snap.exists else None
+            merged_scores, merged_finals, _, new_mastered = merge(before or {})
+            rec_ids, error = recommend(new_mastered)
+            data = {
+                "scores": merged_scores,
+                "finals": merged_finals,
+                "mastered": new_mastered
+            }
+            if rec_ids is not None:
+                data["path"] = path_jobs.path_record(new_mastered, rec_ids, PATH_LIMIT, graph_tag)
+            transaction.set(doc_ref, data, merge=True)
+            return before, new_mastered, rec_ids, error
+
+        with stage("firestore_write"):
+            before, new_mastered, rec_ids, error = write(db.transaction())
+    else:
+        with stage("firestore_read"):
+            snap = doc_ref.get()
+        before = snap.to_dict() if snap.exists else None
+        _, _, computed_mastered, new_mastered = merge(before or {})
+        rec_ids, error = recommend(new_mastered)
+
+        # nested maps merge entry by entry and ArrayUnion appends server-side,
+        # so the write carries only what this request changes
+        update = {}
+        if scores:
+            update["scores"] = scores
+        if finals:
+            update["finals"] = finals
+        if computed_mastered:
+            update["mastered"] = db.array_union(computed_mastered)
+        elif before is None:
+            update["mastered"] = []
+        if rec_ids is not None:
+            update["path"] = path_jobs.path_record(new_mastered, rec_ids, PATH_LIMIT, graph_tag)
+        with stage("firestore_write"):
+            doc_ref.set(update, merge=True)
+
+    after = dashboard_stats.merged_doc(before, {"scores": scores, "finals": finals})
+    with stage("firestore_write"):
+        dashboard_stats.apply_delta(db, dashboard_stats.student_delta(before, after))
+
+    if error is not None:
+        return jsonify({"error": "Recommendation error", "details": str(error)}), 500
 
     # map rec_ids to titles
+    G = curriculum_snap.graph
     id_to_title = {n: G.nodes[n].get("title", "") for n in G.nodes}
     recommended = [{"id": rid, "title": id_to_title.get(rid, "")} for rid in rec_ids]
 
@@ -248,65 +610,99 @@ def update_student_scores(student_id):
         "recommended": recommended
     })
 
-@app.route("/students/bulk_upload", methods=["POST"])
-def students_bulk_upload():
+def _recommendation_context():
     """
-    Accepts JSON array of student entries:
-    [
-      {
-        "id": "2022-01339",
-        "name": "Student Name",        # optional
-        "scores": { "topic_id": value, ... },
-        "finals": { "topic_id": value, ... }
-      },
-      ...
-    ]
-    It will upsert student docs and compute updated mastered & recommended for each.
+    recommend(mastered) -> topic ids, an id -> title map and the snapshot graph_tag
+    (stored with each path) for bulk writes, all bound to one curriculum snapshot.
+    recommend is None when the curriculum is not a DAG (entries then get no
+    recommendations).
     """
-    payload = request.get_json() or []
-    if not isinstance(payload, list):
-        return jsonify({"error": "Expected list"}), 400
+    snap = curriculum.snapshot()
+    G = snap.graph
+    def recommend(mastered):
+        return _recommend(snap, mastered, limit=PATH_LIMIT)
 
-    results = []
-    # pre-build graph once
-    topics_ref = db.collection("topics")
-    docs = [{"id": d.id, **d.to_dict()} for d in topics_ref.stream()]
-    G = build_graph_from_topics(docs)
+    try:
+        _curriculum_index(snap)
+    except ValueError:
+        recommend = None
+    id_to_title = {n: G.nodes[n].get("title", "") for n in G.nodes}
+    return recommend, id_to_title, snap.graph_tag
 
-    for entry in payload:
+def _bulk_upsert_students(entries, recommend, id_to_title, graph_tag):
+    """
+    Upsert one chunk of bulk-upload entries and return one result per entry.
+    Reads every student doc in one get_all and writes through chunked batches.
+    """
+    results = []
+    # one multi-document read for every student in the upload
+    students = db.students
+    refs = {}
+    for entry in entries:
+        sid = entry.get("id")
+        if sid and sid not in refs:
+            refs[sid] = students.document(sid)
+    existing_by_id = {}
+    with stage("firestore_read"):
+        for student_snap in db.get_all(list(refs.values())):
+            if student_snap.exists:
+                existing_by_id[student_snap.id] = student_snap.to_dict()
+    stored_by_id = dict(existing_by_id)
+
+    # pass 1: merge scores/finals onto the stored docs (repeated ids build on each other)
+    merged = []
+    merged_by_id = {}
+    for entry in entries:
         sid = entry.get("id")
         if not sid:
-            results.append({"error": "missing id", "entry": entry})
+            merged.append(None)
             continue
-        scores = entry.get("scores", {}) or {}
-        finals = entry.get("finals", {}) or {}
         threshold = float(entry.get("threshold", os.getenv("MASTERED_THRESHOLD", 0.5)))
+        base = merged_by_id.get(sid) or existing_by_id.get(sid, {})
+        merged_scores = dict(base.get("scores", {}) or {})
+        merged_scores.update(entry.get("scores", {}) or {})
+        merged_finals = dict(base.get("finals", {}) or {})
+        merged_finals.update(entry.get("finals", {}) or {})
+        merged_by_id[sid] = {"scores": merged_scores, "finals": merged_finals}
+        merged.append((merged_scores, merged_finals, threshold))
+
+    # mastery for the whole upload in one vectorized pass
+    scored = [m for m in merged if m is not None]
+    computed = iter(compute_mastered_batch(
+        [(sc, fi) for sc, fi, _ in scored],
+        [thr for _, _, thr in scored],
+    ))
+
+    # pass 2: mastered lists, recommendations and writes, in upload order
+    writes = []
+    for entry, m in zip(entries, merged):
+        if m is None:
+            results.append({"error": "missing id", "entry": entry})
+            continue
+        sid = entry.get("id")
+        merged_scores, merged_finals, _ = m
+        existing = existing_by_id.get(sid, {})
 
-        doc_ref = db.collection("students").document(sid)
-        snap = doc_ref.get()
-        existing = snap.to_dict() if snap.exists else {}
-
-        merged_scores = dict(existing.get("scores", {}) or {})
-        merged_scores.update(scores)
-        merged_finals = dict(existing.get("finals", {}) or {})
-        merged_finals.update(finals)
-
-        computed_mastered = compute_mastered_from_scores(merged_scores, merged_finals, threshold)
+        computed_mastered = next(computed)
         existing_mastered = list(existing.get("mastered", []) or [])
         new_mastered = list(dict.fromkeys(existing_mastered + computed_mastered))
 
-        doc_ref.set({
+        data = {
             "name": entry.get("name", existing.get("name")),
             "scores": merged_scores,
             "finals": merged_finals,
             "mastered": new_mastered
-        }, merge=True)
+        }
+        writes.append((refs[sid], data))
+        # later entries for the same id build on this one, as with sequential writes
+        existing_by_id[sid] = {**existing, **data}
 
         # recommend
         try:
-            rec_ids = recommend_next_topics(G, new_mastered, limit=10)
-            id_to_title = {n: G.nodes[n].get("title", "") for n in G.nodes}
+            rec_ids = recommend(new_mastered) if recommend is not None else []
             recommended = [{"id": rid, "title": id_to_title.get(rid, "")} for rid in rec_ids]
+            if recommend is not None:
+                data["path"] = path_jobs.path_record(new_mastered, rec_ids, PATH_LIMIT, graph_tag)
         except Exception as e:
             recommended = []
         results.append({
@@ -315,20 +711,173 @@ def students_bulk_upload():
             "recommended": recommended
         })
 
+    # chunked batch commits (Firestore caps a batch at 500 writes)
+    for chunk in _chunks(writes, BULK_WRITE_CHUNK):
+        batch = db.batch()
+        for doc_ref, data in chunk:
+            batch.set(doc_ref, data, merge=True)
+        with stage("firestore_write"):
+            batch.commit()
+    for sid in refs:
+        identity_cache.invalidate(sid)
+
+    # dashboard counters: compare each student's stored doc with its final state
+    delta = {}
+    for sid in refs:
+        change = dashboard_stats.student_delta(stored_by_id.get(sid), existing_by_id[sid])
+        for k, v in change.items():
+            delta[k] = delta.get(k, 0) + v
+    with stage("firestore_write"):
+        dashboard_stats.apply_delta(db, delta)
+
+    return results
+
+@app.route("/students/bulk_upload", methods=["POST"])
+def students_bulk_upload():
+    """
+    Accepts JSON array of student entries:
+    [
+      {
+        "id": "2022-01339",
+        "name": "Student Name",        # optional
+        "scores": { "topic_id": value, ... },
+        "finals": { "topic_id": value, ... }
+      },
+      ...
+    ]
+    It will upsert student docs and compute updated mastered & recommended for each.
+    """
+    payload = request.get_json() or []
+    if not isinstance(payload, list):
+        return jsonify({"error": "Expected list"}), 400
+
+    recommend, id_to_title, graph_tag = _recommendation_context()
+    results = _bulk_upsert_students(payload, recommend, id_to_title, graph_tag)
     return jsonify({"results": results})
 
+# entries per chunk in the streaming bulk upload
+BULK_STREAM_CHUNK = int(os.getenv("BULK_STREAM_CHUNK", 200))
+
+def _parse_csv_value(v):
+    # spreadsheet cells arrive as text; keep numbers numeric in the stored maps
+    for cast in (int, float):
+        try:
+            return cast(v)
+        except ValueError:
+            pass
+    return v
+
+def _csv_entries(lines):
+    """
+    Yield (entry, error) pairs from CSV with columns id, name, threshold,
+    scores.<topic_id>, finals.<topic_id>. Empty cells are skipped.
+    """
+    reader = csv.reader(lines)
+    header = [col.strip() for col in next(reader, None) or []]
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        entry = {"scores": {}, "finals": {}}
+        for col, cell in zip(header, row):
+            cell = cell.strip()
+            if not col or cell == "":
+                continue
+            field, _, topic_id = col.partition(".")
+            if field in ("scores", "finals") and topic_id:
+                entry[field][topic_id] = _parse_csv_value(cell)
+            elif col in ("id", "name", "threshold"):
+                entry[col] = cell
+        yield entry, None
+
+def _ndjson_entries(lines):
+    """
+    Yield (entry, error) pairs from NDJSON; a bad line yields an error result instead.
+    """
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            yield None, {"error": "invalid json", "line": line_no}
+            continue
+        if not isinstance(entry, dict):
+            yield None, {"error": "expected object", "line": line_no}
+            continue
+        yield entry, None
+
+@app.route("/students/bulk_upload/stream", methods=["POST"])
+def students_bulk_upload_stream():
+    """
+    Streaming variant of /students/bulk_upload for whole-school imports.
+    Body is NDJSON (one student entry per line) or CSV (Content-Type: text/csv) with a
+    header row: id, name, threshold, scores.<topic_id>, finals.<topic_id>.
+    Entries are processed in chunks of BULK_STREAM_CHUNK and the response is NDJSON:
+    one result per entry (same shape as the bulk_upload results), a progress line
+    after each chunk and a final {"done": true, ...} line.
+    """
+    # utf-8-sig: Excel's "CSV UTF-8" starts with a BOM that would end up in the first header
+    lines = io.TextIOWrapper(request.stream, encoding="utf-8-sig", newline="")
+    if request.mimetype == "text/csv":
+        entries = _csv_entries(lines)
+    else:
+        entries = _ndjson_entries(lines)
+
+    def run():
+        recommend, id_to_title, graph_tag = _recommendation_context()
+        counts = {"processed": 0, "errors": 0}
+
+        def emit(results):
+            for r in results:
+                counts["processed"] += 1
+                counts["errors"] += "error" in r
+                yield json.dumps(r) + "\n"
+
+        def flush(chunk):
+            try:
+                results = _bulk_upsert_students(chunk, recommend, id_to_title, graph_tag)
+            except Exception as e:
+                # e.g. a failed commit: report it on every entry of the chunk
+                results = [{"error": str(e), "id": entry.get("id")} for entry in chunk]
+            yield from emit(results)
+            yield json.dumps({"progress": dict(counts)}) + "\n"
+
+        chunk = []
+        for entry, error in entries:
+            if error:
+                yield from emit([error])
+                continue
+            try:
+                float(entry.get("threshold", os.getenv("MASTERED_THRESHOLD", 0.5)))
+            except (TypeError, ValueError):
+                # keep one bad row from failing the rest of its chunk
+                yield from emit([{"error": "invalid threshold", "id": entry.get("id")}])
+                continue
+            chunk.append(entry)
+            if len(chunk) >= BULK_STREAM_CHUNK:
+                yield from flush(chunk)
+                chunk = []
+        if chunk:
+            yield from flush(chunk)
+        yield json.dumps({"done": True, **counts}) + "\n"
+
+    return Response(stream_with_context(run()), mimetype="application/x-ndjson")
+
 @app.route("/students/list", methods=["GET"])
 def list_students():
-    snaps = db.collection("students").stream()
+    # projection keeps the scores/finals/content_seen maps off the wire
+    try:
+        query, limit = _list_query("students", STUDENT_LIST_FIELDS)
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+    with stage("firestore_read"):
+        snaps = list(query.stream())
     out = []
     for d in snaps:
         doc = d.to_dict()
         # compute status for backward compatibility
-        total_score = doc.get("score") or (doc.get("scores", {}).get("general") if doc.get("scores") else 0)
-        total_final = doc.get("final") or (doc.get("finals", {}).get("general") if doc.get("finals") else 0)
-        status = ""
-        if total_final:
-            status = "PASS" if total_score >= (total_final / 2) else "FAIL"
+        total_score, total_final, status = dashboard_stats.student_status(doc)
         out.append({
             "id": d.id,
             "name": doc.get("name"),
@@ -336,11 +885,11 @@ def list_students():
             "final": total_final,
             "status": status
         })
-    return jsonify(out)
+    return _list_response(out, limit)
 
 @app.route("/students/<student_id>", methods=["GET"])
 def get_student(student_id):
-    doc_ref = db.collection("students").document(student_id)
+    doc_ref = db.students.document(student_id)
     snap = doc_ref.get()
     if not snap.exists:
         return jsonify({"error": "Student not found"}), 404
@@ -351,94 +900,193 @@ def get_student(student_id):
 def upsert_student(student_id):
     body = request.get_json() or {}
     allowed = {}
-    for k in ("name", "scores", "finals", "mastered"):
+    for k in ("name", "section", "scores", "finals", "mastered"):
         if k in body:
             allowed[k] = body[k]
 
     if not allowed:
         return jsonify({"error": "No valid fields provided"}), 400
 
-    db.collection("students").document(student_id).set(allowed, merge=True)
+    doc_ref = db.students.document(student_id)
+    snap = doc_ref.get()
+    before = snap.to_dict() if snap.exists else None
+    doc_ref.set(allowed, merge=True)
+    identity_cache.invalidate(student_id)
+    dashboard_stats.apply_delta(db, dashboard_stats.student_delta(before, dashboard_stats.merged_doc(before, allowed)))
     return jsonify({"message": f"Student {student_id} updated"}), 201
 
-@app.route("/students/<student_id>/path", methods=["GET"])
-def student_path(student_id):
-    # Query params
+def _topic_details(snap):
+    # id -> detailed topic entry used by the path endpoints, once per curriculum version
+    G = snap.graph
+    return {
+        n: {
+            "id": n,
+            "title": G.nodes[n].get("name") or G.nodes[n].get("title", n),
+            "description": G.nodes[n].get("description", ""),
+            "cluster": G.nodes[n].get("cluster", "Uncategorized")
+        }
+        for n in G.nodes
+    }
+
+def _detailed(topic_ids, details):
+    return [
+        details.get(tid) or {"id": tid, "title": tid, "description": "", "cluster": "Uncategorized"}
+        for tid in topic_ids
+    ]
+
+def _path_limit(value):
+    # at least one topic; a negative limit would slice from the end of the path
     try:
-        limit = int(request.args.get("limit", 10))
+        return max(1, int(value))
     except (ValueError, TypeError):
-        limit = 10
+        return 10
+
+@app.route("/students/<student_id>/path", methods=["GET"])
+def student_path(student_id):
+    limit = _path_limit(request.args.get("limit", 10))
 
     # fetch student doc
-    doc_ref = db.collection("students").document(student_id)
-    snap = doc_ref.get()
+    doc_ref = db.students.document(student_id)
+    with stage("firestore_read"):
+        snap = doc_ref.get()
     if not snap.exists:
         return jsonify({"error": "Student not found"}), 404
     student = snap.to_dict()
+    mastered = student_mastered(student)
 
-    # compute mastered topics
-    # priority: explicit 'mastered' list -> scores+finals mapping -> empty
-    mastered = list(student.get("mastered", []) or [])
-    if not mastered and student.get("scores"):
-        scores = student.get("scores", {})        # e.g. {"fractions": 31}
-        finals = student.get("finals", {})        # e.g. {"fractions": 60}
-        for topic_id, sc in scores.items():
-            max_sc = finals.get(topic_id, student.get("final") or 0)
-            if max_sc and sc >= (max_sc / 2):
-                mastered.append(topic_id)
-
-    # Build graph and mapping id -> title
-    topics_ref = db.collection("topics")
-    docs = [{"id": d.id, **d.to_dict()} for d in topics_ref.stream()]
-    G = build_graph_from_topics(docs)
+    snap = curriculum.snapshot()
 
     # validate DAG
-    cycles = validate_dag(G)
+    cycles = _curriculum_cycles(snap)
     if cycles:
         return jsonify({"error": "Curriculum graph has cycles", "cycles": cycles}), 500
 
     try:
-        rec_ids = recommend_next_topics(G, mastered, limit=limit)
+        rec_ids = _student_recommendations(snap, student, mastered, limit)
     except ValueError as e:
         return jsonify({"error": str(e)}), 500
 
-    # Map topic IDs → detailed info
-    id_to_data = {
-        n: {
-            "title": G.nodes[n].get("name") or G.nodes[n].get("title", n),
-            "description": G.nodes[n].get("description", ""),
-            "cluster": G.nodes[n].get("cluster", "Uncategorized")
-        }
-        for n in G.nodes
-    }
-
-    # Build detailed recommended and mastered lists
-    recommended = [
-        {
-            "id": rid,
-            "title": id_to_data.get(rid, {}).get("title", rid),
-            "description": id_to_data.get(rid, {}).get("description", ""),
-            "cluster": id_to_data.get(rid, {}).get("cluster", "Uncategorized")
-        }
-        for rid in rec_ids
-    ]
+    details = snap.derive("topic_details", _topic_details)
+    return jsonify({
+        "student_id": student_id,
+        "mastered": _detailed(mastered, details),
+        "recommended": _detailed(rec_ids, details)
+    })
 
-    mastered_detailed = [
-        {
-            "id": mid,
-            "title": id_to_data.get(mid, {}).get("title", mid),
-            "description": id_to_data.get(mid, {}).get("description", ""),
-            "cluster": id_to_data.get(mid, {}).get("cluster", "Uncategorized")
-        }
-        for mid in mastered
-    ]
+@app.route("/students/<student_id>/path_to/<topic_id>", methods=["GET"])
+def student_path_to(student_id, topic_id):
+    """
+    Topics between a student and a target topic: the target's unmastered ancestors
+    in topological order, each with "unlocks" (unmastered topics downstream of it)
+    and "ready" (all direct prerequisites mastered).
+    """
+    doc_ref = db.students.document(student_id)
+    with stage("firestore_read"):
+        snap = doc_ref.get()
+    if not snap.exists:
+        return jsonify({"error": "Student not found"}), 404
+    mastered = student_mastered(snap.to_dict())
 
+    snap = curriculum.snapshot()
+    cycles = _curriculum_cycles(snap)
+    if cycles:
+        return jsonify({"error": "Curriculum graph has cycles", "cycles": cycles}), 500
+    reach = _reachability(snap)
+    if topic_id not in reach.index.ids:
+        return jsonify({"error": "Topic not found"}), 404
+
+    with stage("recommend"):
+        steps = reach.path_to(topic_id, mastered)
+    details = snap.derive("topic_details", _topic_details)
+    path = [{**d, "unlocks": step["unlocks"], "ready": step["ready"]}
+            for d, step in zip(_detailed([step["id"] for step in steps], details), steps)]
     return jsonify({
         "student_id": student_id,
-        "mastered": mastered_detailed,
-        "recommended": recommended
+        "target": {**details[topic_id], "mastered": topic_id in set(mastered)},
+        "path": path,
+        "remaining": len(path)
     })
 
+@app.route("/students/paths", methods=["POST"])
+def student_paths():
+    """
+    Learning paths for many students at once.
+    POST payload: {"student_ids": ["2022-01339", ...]} or {"section": "A"}, plus
+    optional "limit" (default 10). Student docs are read in one get_all (or one
+    section query) and the curriculum is validated once for the whole request.
+    Returns {"results": [...]} in request order; each entry has the same shape as
+    /students/<id>/path, or {"student_id", "error"} for an unknown id.
+    """
+    body = request.get_json() or {}
+    limit = _path_limit(body.get("limit", request.args.get("limit", 10)))
+    student_ids = body.get("student_ids")
+    section = body.get("section")
+
+    if student_ids is not None:
+        if not isinstance(student_ids, list) or not all(isinstance(i, str) and i for i in student_ids):
+            return jsonify({"error": "student_ids must be a list of ids"}), 400
+        refs = [db.students.document(sid) for sid in dict.fromkeys(student_ids)]
+        with stage("firestore_read"):
+            found = {d.id: d.to_dict() for d in db.get_all(refs) if d.exists}
+        students = [(sid, found.get(sid)) for sid in student_ids]
+    elif section:
+        with stage("firestore_read"):
+            students = [(d.id, d.to_dict()) for d in db.students.where("section", "==", section).stream()]
+    else:
+        return jsonify({"error": "student_ids or section required"}), 400
+
+    snap = curriculum.snapshot()
+    cycles = _curriculum_cycles(snap)
+    if cycles:
+        return jsonify({"error": "Curriculum graph has cycles", "cycles": cycles}), 500
+    try:
+        _curriculum_index(snap)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 500
+    details = snap.derive("topic_details", _topic_details)
+
+    results = []
+    for sid, student in students:
+        if student is None:
+            results.append({"student_id": sid, "error": "Student not found"})
+            continue
+        mastered = student_mastered(student)
+        results.append({
+            "student_id": sid,
+            "mastered": _detailed(mastered, details),
+            "recommended": _detailed(_student_recommendations(snap, student, mastered, limit), details)
+        })
+    return jsonify({"results": results})
+
+
+def _transactional_requested(body):
+    # opt-in read-merge-write in a transaction for callers that need the merged result
+    flag = body.get("transactional", request.args.get("transactional", ""))
+    return flag is True or str(flag).lower() in ("1", "true")
+
+def _add_to_student_array(student_id, field, values, transactional=False):
+    """
+    Add values to an array field of a student doc.
+    By default this is one ArrayUnion write with no read and returns None. With
+    transactional=True the doc is read and written in a transaction and the merged
+    list is returned. A missing student doc is created.
+    """
+    doc_ref = db.students.document(student_id)
+    if transactional:
+        @db.transactional
+        def write(transaction):
+            snap = doc_ref.get(transaction=transaction)
+            existing = (snap.to_dict() or {}).get(field, []) if snap.exists else []
+            merged = list(dict.fromkeys(list(existing or []) + list(values)))
+            transaction.set(doc_ref, {field: merged}, merge=True)
+            return merged
+
+        with stage("firestore_write"):
+            return write(db.transaction())
+
+    with stage("firestore_write"):
+        doc_ref.set({field: db.array_union(values)}, merge=True)
+    return None
 
 @app.route("/students/<student_id>/mastered", methods=["POST"])
 def add_mastered(student_id):
@@ -446,13 +1094,10 @@ def add_mastered(student_id):
     topics = body.get("topics")
     if not topics or not isinstance(topics, list):
         return jsonify({"error": "Missing topics list"}), 400
-    doc_ref = db.collection("students").document(student_id)
-    snap = doc_ref.get()
-    existing = snap.to_dict().get("mastered", []) if snap.exists else []
-    # merge unique
-    new_mastered = list(dict.fromkeys(existing + topics))
-    doc_ref.set({"mastered": new_mastered}, merge=True)
-    return jsonify({"message": "Mastered updated", "mastered": new_mastered})
+    merged = _add_to_student_array(student_id, "mastered", topics, _transactional_requested(body))
+    if merged is None:
+        return jsonify({"message": "Mastered updated", "added": topics})
+    return jsonify({"message": "Mastered updated", "mastered": merged})
 
 @app.route("/content", methods=["POST"])
 def add_content():
@@ -502,33 +1147,40 @@ def add_content():
         # data["link"] = uploaded_file_url
         pass
 
-    doc_ref = db.collection("contents").document()
+    doc_ref = db.contents.document()
     doc_ref.set(data)
+    content_index.invalidate()
     return jsonify({"message":"Content added", "id": doc_ref.id}), 201
 
 @app.route("/content/<topic_id>", methods=["GET"])
 def get_content_for_topic(topic_id):
-    snaps = db.collection("contents").where("topic_id", "==", topic_id).stream()
-    out = []
-    for d in snaps:
-        doc = d.to_dict()
-        out.append({"id": d.id, **doc})
-    return jsonify(out)
+    return jsonify(content_index.for_topic(topic_id))
 
 
 @app.route("/content", methods=["GET"])
 def list_all_content():
-    snaps = db.collection("contents").stream()
+    # ?topic_ids=a,b,c -> {topic_id: [content, ...]} from the grouped index
+    if "topic_ids" in request.args:
+        topic_ids = [t.strip() for t in request.args["topic_ids"].split(",") if t.strip()]
+        return jsonify(content_index.for_topics(dict.fromkeys(topic_ids)))
+
+    # optional ?fields=title,link,... projection
+    fields = [f.strip() for f in request.args.get("fields", "").split(",") if f.strip()]
+    try:
+        query, limit = _list_query("contents", fields)
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
     out = []
-    for d in snaps:
+    for d in query.stream():
         doc = d.to_dict()
         out.append({"id": d.id, **doc})
-    return jsonify(out)
+    return _list_response(out, limit)
 
 
 @app.route("/content/<doc_id>", methods=["DELETE"])
 def delete_content(doc_id):
-    db.collection("contents").document(doc_id).delete()
+    db.contents.document(doc_id).delete()
+    content_index.invalidate()
     return jsonify({"message": "Content deleted"}), 200
 
 @app.route("/content/<doc_id>", methods=["POST"])
@@ -538,7 +1190,8 @@ def update_content(doc_id):
     if not allowed:
         return jsonify({"error": "No valid fields to update"}), 400
 
-    db.collection("contents").document(doc_id).set(allowed, merge=True)
+    db.contents.document(doc_id).set(allowed, merge=True)
+    content_index.invalidate()
     return jsonify({"message": f"Content {doc_id} updated"}), 200
 
 @app.route("/students/<student_id>/content_seen", methods=["POST"])
@@ -547,13 +1200,9 @@ def mark_content_seen(student_id):
     content_id = body.get("content_id")
     if not content_id:
         return jsonify({"error":"content_id required"}), 400
-    doc_ref = db.collection("students").document(student_id)
-    snap = doc_ref.get()
-    existing = snap.to_dict() if snap.exists else {}
-    seen = list(existing.get("content_seen", []) or [])
-    if content_id not in seen:
-        seen.append(content_id)
-    doc_ref.set({"content_seen": seen}, merge=True)
+    seen = _add_to_student_array(student_id, "content_seen", [content_id], _transactional_requested(body))
+    if seen is None:
+        return jsonify({"message":"ok", "content_id": content_id})
     return jsonify({"message":"ok", "content_seen": seen})
 
 @app.route("/login", methods=["POST"])
@@ -564,27 +1213,33 @@ def login():
     if not user_id:
         return jsonify({"error": "Missing user ID"}), 400
 
-    # 1️⃣ Check teacher first
-    teacher_ref = db.collection("users").document(user_id).get()
-    if teacher_ref.exists:
-        teacher = teacher_ref.to_dict()
-        return jsonify({
-            "id": user_id,
-            "name": teacher.get("name"),
-            "role": "teacher"
-        })
+    identity = identity_cache.get(user_id)
+    if identity is None:
+        identity = _lookup_identity(user_id)
+        if identity is None:
+            return jsonify({"error": "User not found"}), 404
+        identity_cache.put(user_id, identity)
+    return jsonify({"id": user_id, **identity})
 
-    # 2️⃣ Check student next
-    student_ref = db.collection("students").document(user_id).get()
-    if student_ref.exists:
-        student = student_ref.to_dict()
-        return jsonify({
-            "id": user_id,
-            "name": student.get("name"),
-            "role": "student"
-        })
-
-    return jsonify({"error": "User not found"}), 404
+def _lookup_identity(user_id):
+    """
+    {"name", "role"} for a login id, from users/<id> and students/<id> read in one
+    get_all (teachers win when an id is in both), or None.
+    """
+    refs = [db.users.document(user_id), db.students.document(user_id)]
+    with stage("firestore_read"):
+        found = {snap.reference.path: snap for snap in db.get_all(refs) if snap.exists}
+    return _identity_from_snapshots(found.get(refs[0].path), found.get(refs[1].path))
+
+def _identity_from_snapshots(teacher, student):
+    if teacher is not None:
+        return {"name": teacher.to_dict().get("name"), "role": "teacher"}
+    if student is not None:
+        return {"name": student.to_dict().get("name"), "role": "student"}
+    return None
+
+if os.getenv("WARM_UP", "1") == "1":
+    start_warm_up()
 
 if __name__ == "__main__":
     app.run(port=5000, debug=True)
@@ -0,0 +1,139 @@
+# backend/python/asgi_app.py
+"""
+Async serving mode.
+
+    uvicorn asgi_app:app --port 8000
+
+GET /students/<id>/path and POST /login are served on the event loop with the
+Firestore async client: the reads a request needs are issued together
+(asyncio.gather / get_all) and a worker keeps many Firestore calls in flight instead of one
+per thread. Every other route goes through to the Flask app (asgiref runs it in a
+thread pool), so both modes serve the same API and share the curriculum cache.
+"""
+import asyncio
+import json
+import re
+import time
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+
+import app as flask_app
+import metrics
+from mastery import student_mastered
+from storage import get_async_storage
+
+adb = get_async_storage(flask_app.db)
+wsgi = WsgiToAsgi(flask_app.app)
+
+
+async def _read_json(receive):
+    chunks = []
+    more = True
+    while more:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        more = message.get("more_body", False)
+    try:
+        return json.loads(b"".join(chunks) or b"null")
+    except ValueError:
+        return None
+
+
+async def _send_json(send, payload, status=200):
+    body = json.dumps(payload, sort_keys=True).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            # same as flask-cors' default on the Flask routes
+            (b"access-control-allow-origin", b"*"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+    return status
+
+
+async def student_path(scope, receive, send, student_id):
+    query = parse_qs(scope.get("query_string", b"").decode())
+    limit = flask_app._path_limit(query.get("limit", [10])[0])
+
+    # student doc and curriculum are independent: fetch both at once
+    with metrics.stage("firestore_read"):
+        student_snap, snap = await asyncio.gather(
+            adb.students.document(student_id).get(),
+            asyncio.to_thread(flask_app.curriculum.snapshot),
+        )
+    if not student_snap.exists:
+        return await _send_json(send, {"error": "Student not found"}, 404)
+    student = student_snap.to_dict()
+    mastered = student_mastered(student)
+
+    cycles = flask_app._curriculum_cycles(snap)
+    if cycles:
+        return await _send_json(send, {"error": "Curriculum graph has cycles", "cycles": cycles}, 500)
+    try:
+        rec_ids = flask_app._student_recommendations(snap, student, mastered, limit)
+    except ValueError as e:
+        return await _send_json(send, {"error": str(e)}, 500)
+
+    details = snap.derive("topic_details", flask_app._topic_details)
+    return await _send_json(send, {
+        "student_id": student_id,
+        "mastered": flask_app._detailed(mastered, details),
+        "recommended": flask_app._detailed(rec_ids, details),
+    })
+
+
+async def login(scope, receive, send):
+    data = await _read_json(receive)
+    user_id = data.get("id") if isinstance(data, dict) else None
+    if not user_id:
+        return await _send_json(send, {"error": "Missing user ID"}, 400)
+
+    identity = flask_app.identity_cache.get(user_id)
+    if identity is None:
+        # users/<id> and students/<id> in one get_all, as in the Flask handler
+        refs = [adb.users.document(user_id), adb.students.document(user_id)]
+        with metrics.stage("firestore_read"):
+            found = {snap.reference.path: snap for snap in await adb.get_all(refs) if snap.exists}
+        identity = flask_app._identity_from_snapshots(found.get(refs[0].path), found.get(refs[1].path))
+        if identity is None:
+            return await _send_json(send, {"error": "User not found"}, 404)
+        flask_app.identity_cache.put(user_id, identity)
+    return await _send_json(send, {"id": user_id, **identity})
+
+
+ROUTES = [
+    ("GET", re.compile(r"^/students/(?P<student_id>[^/]+)/path$"), "/students/<student_id>/path", student_path),
+    ("POST", re.compile(r"^/login$"), "/login", login),
+]
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # no-op when importing app already started it (WARM_UP=1)
+            flask_app.start_warm_up()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+    if scope["type"] == "http":
+        for method, pattern, rule, handler in ROUTES:
+            match = pattern.match(scope["path"])
+            if match and scope["method"] == method:
+                start = time.perf_counter()
+                status = await handler(scope, receive, send, **match.groupdict())
+                metrics.REQUEST_LATENCY.observe(time.perf_counter() - start, route=rule,
+                                                method=method, status=status)
+                return
+    await wsgi(scope, receive, send)
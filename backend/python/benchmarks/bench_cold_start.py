@@ -0,0 +1,122 @@
+# backend/python/benchmarks/bench_cold_start.py
+"""
+Cold-start cost of a backend worker: import time and first-request time.
+
+Run from backend/python:
+    python -m benchmarks.bench_cold_start                        # memory store, synthetic data
+    python -m benchmarks.bench_cold_start --topics 2000 --latency-ms 30
+    python -m benchmarks.bench_cold_start --storage firestore --student <id>
+
+Each run is a fresh interpreter. It is measured once with WARM_UP=0 (the first
+request builds the curriculum), once with WARM_UP=1 (the first request is sent
+after /ready reports ready) and, for the memory store, once with WARM_UP=0 and a
+curriculum snapshot file (CURRICULUM_SNAPSHOT) exported from the same fixture.
+Times are the median over --repeat runs, in ms.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+import curriculum_snapshot
+from benchmarks.synthetic import layered_curriculum, mastery_sets
+from graph_service import build_graph_from_topics
+
+# runs in the child interpreter; prints one JSON line
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import app
+t_import = time.perf_counter() - t0
+client = app.app.test_client()
+t_ready = None
+if app.os.getenv("WARM_UP") == "1":
+    while client.get("/ready").status_code != 200:
+        time.sleep(0.002)
+    t_ready = time.perf_counter() - t0
+out = {"import_ms": t_import * 1000, "ready_ms": t_ready * 1000 if t_ready else None}
+for name, path in json.loads(sys.argv[1]).items():
+    start = time.perf_counter()
+    status = client.get(path).status_code
+    out[name + "_ms"] = (time.perf_counter() - start) * 1000
+    out[name + "_status"] = status
+print(json.dumps(out))
+"""
+
+
+def _fixture(n_topics: int, seed: int) -> str:
+    topics = layered_curriculum(n_topics, seed=seed)
+    mastered = mastery_sets(topics, 1, seed=seed)[0]
+    data = {
+        "topics": {t["id"]: {k: v for k, v in t.items() if k != "id"} for t in topics},
+        "students": {"bench_student": {"name": "Bench", "mastered": mastered}},
+    }
+    fd, path = tempfile.mkstemp(suffix=".json", prefix="page_cold_start_")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return path
+
+
+def _snapshot_file(fixture: str) -> str:
+    with open(fixture, encoding="utf-8") as f:
+        docs = [{"id": tid, **doc} for tid, doc in json.load(f)["topics"].items()]
+    fd, path = tempfile.mkstemp(suffix=".snap", prefix="page_cold_start_")
+    os.close(fd)
+    # the fixture has no meta/curriculum doc, so stored version 0 keeps the file current
+    curriculum_snapshot.write(path, 0, docs, build_graph_from_topics(docs))
+    return path
+
+
+def _run_child(env: Dict[str, str], paths: Dict[str, str]) -> Dict[str, float]:
+    out = subprocess.run([sys.executable, "-c", CHILD, json.dumps(paths)], env=env,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--storage", choices=["memory", "firestore"], default="memory")
+    parser.add_argument("--topics", type=int, default=1000, help="synthetic curriculum size (memory)")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated round trip (memory)")
+    parser.add_argument("--student", default="bench_student", help="student id for the path request")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, PAGE_STORAGE=args.storage)
+    fixture = snapshot = None
+    modes = [("lazy", {"WARM_UP": "0"}), ("warm-up", {"WARM_UP": "1"})]
+    if args.storage == "memory":
+        fixture = _fixture(args.topics, args.seed)
+        snapshot = _snapshot_file(fixture)
+        env.update(PAGE_MEMORY_SEED=fixture, PAGE_MEMORY_LATENCY_MS=str(args.latency_ms))
+        modes.append(("snapshot", {"WARM_UP": "0", "CURRICULUM_SNAPSHOT": snapshot}))
+    paths = {
+        "first_path": f"/students/{args.student}/path",
+        "first_graph_details": "/topics/graph/details",
+    }
+
+    try:
+        print(f"{'mode':<10}{'import':>10}{'ready':>10}{'path':>10}{'details':>10}   (ms)")
+        for label, extra in modes:
+            runs: List[Dict[str, float]] = [_run_child(dict(env, **extra), paths) for _ in range(args.repeat)]
+
+            def med(key):
+                values = [r[key] for r in runs if r.get(key) is not None]
+                return statistics.median(values) if values else float("nan")
+
+            print(f"{label:<10}{med('import_ms'):>10.1f}{med('ready_ms'):>10.1f}"
+                  f"{med('first_path_ms'):>10.1f}{med('first_graph_details_ms'):>10.1f}")
+    finally:
+        for path in (fixture, snapshot):
+            if path:
+                os.unlink(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
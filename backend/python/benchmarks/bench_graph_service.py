@@ -0,0 +1,229 @@
+# backend/python/benchmarks/bench_graph_service.py
+"""
+Benchmarks for graph_service on synthetic curricula.
+
+Run from backend/python:
+    python -m benchmarks.bench_graph_service                      # print a table
+    python -m benchmarks.bench_graph_service --out results.json   # save results
+    python -m benchmarks.bench_graph_service --compare benchmarks/baseline.json
+
+Each function is timed over --repeat runs per curriculum size (median and min, ms)
+and its peak traced allocation is measured on one extra run (KiB). With --compare,
+any median slower than baseline * --tolerance is reported and the exit code is 1,
+so a regression in the recommendation path fails the pre-deploy check. Functions
+the baseline has no entry for are reported too (and fail the check) until the
+baseline is regenerated with --out.
+
+Absolute times depend on the machine, so every run also times a fixed networkx
+workload (calibration_ms in meta) and --compare scales the baseline by the ratio
+of the two calibrations. That absorbs an overall faster or slower machine, not
+differences in how it runs particular code or load that changes during the run
+(calibration is timed once, first); for a tight --tolerance record the baseline
+on the machine that runs the check (the CI runner).
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+import networkx as nx
+
+from benchmarks.synthetic import layered_curriculum, mastery_sets
+from graph_service import (
+    CurriculumIndex,
+    ReachabilityIndex,
+    assign_levels_to_graph,
+    build_graph_from_topics,
+    recommend_next_topics,
+    validate_dag,
+)
+
+DEFAULT_SIZES = [100, 1000, 10000]
+
+CALIBRATION_TOPICS = 1000
+CALIBRATION_REPEAT = 15
+
+# reported per student: total time over the mastery sets / number of sets
+PER_STUDENT = {"recommend_next_topics", "CurriculumIndex.recommend"}
+
+
+def _measure(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    times = []
+    # as timeit does: a collection landing in one run would swing the median
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append((time.perf_counter() - start) * 1000)
+    finally:
+        gc.enable()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "median_ms": round(statistics.median(times), 4),
+        "min_ms": round(min(times), 4),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def bench_size(n_topics: int, repeat: int, n_students: int, seed: int) -> Dict[str, Dict[str, float]]:
+    docs = layered_curriculum(n_topics, seed=seed)
+    students = mastery_sets(docs, n_students, seed=seed)
+    G = build_graph_from_topics(docs)
+    index = CurriculumIndex(G)
+
+    def recommend_all():
+        for mastered in students:
+            recommend_next_topics(G, mastered)
+
+    def index_recommend_all():
+        for mastered in students:
+            index.recommend(mastered)
+
+    cases = {
+        "build_graph_from_topics": lambda: build_graph_from_topics(docs),
+        "validate_dag": lambda: validate_dag(G),
+        "assign_levels_to_graph": lambda: assign_levels_to_graph(G),
+        "CurriculumIndex": lambda: CurriculumIndex(G),
+        "ReachabilityIndex": lambda: ReachabilityIndex(index),
+        "recommend_next_topics": recommend_all,
+        "CurriculumIndex.recommend": index_recommend_all,
+    }
+    out = {}
+    for name, fn in cases.items():
+        result = _measure(fn, repeat)
+        if name in PER_STUDENT:
+            result["median_ms"] = round(result["median_ms"] / n_students, 4)
+            result["min_ms"] = round(result["min_ms"] / n_students, 4)
+        out[name] = result
+    return out
+
+
+def calibrate(seed: int = 0) -> float:
+    """
+    Median ms of a fixed workload (graph build, topological sort, ancestor sets)
+    that does not go through graph_service, so it only moves with the machine.
+    """
+    docs = layered_curriculum(CALIBRATION_TOPICS, seed=seed)
+    edges = [(p, t["id"]) for t in docs for p in t["prerequisites"]]
+
+    def workload():
+        G = nx.DiGraph(edges)
+        order = list(nx.topological_sort(G))
+        for n in order[-50:]:
+            nx.ancestors(G, n)
+
+    return _measure(workload, CALIBRATION_REPEAT)["median_ms"]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return ""
+
+
+def run(sizes: List[int], repeat: int, n_students: int, seed: int) -> Dict[str, Any]:
+    print("… calibration", file=sys.stderr)
+    calibration = calibrate()
+    results = {}
+    for n in sizes:
+        print(f"… {n} topics", file=sys.stderr)
+        results[str(n)] = bench_size(n, repeat, n_students, seed)
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "networkx": nx.__version__,
+            "repeat": repeat,
+            "students": n_students,
+            "seed": seed,
+            "calibration_ms": calibration,
+        },
+        "results": results,
+    }
+
+
+def print_table(report: Dict[str, Any]) -> None:
+    print(f"{'topics':>7}  {'function':<28}{'median ms':>12}{'min ms':>12}{'peak KiB':>12}")
+    for size, funcs in report["results"].items():
+        for name, r in funcs.items():
+            print(f"{size:>7}  {name:<28}{r['median_ms']:>12.3f}{r['min_ms']:>12.3f}{r['peak_kib']:>12.1f}")
+
+
+def machine_scale(report: Dict[str, Any], baseline: Dict[str, Any]) -> float:
+    """
+    How much slower this machine is than the baseline's (1.0 when either run has no calibration).
+    """
+    ours = report["meta"].get("calibration_ms")
+    theirs = baseline.get("meta", {}).get("calibration_ms")
+    if not ours or not theirs:
+        return 1.0
+    return ours / theirs
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Return one line per function whose median regressed past baseline * tolerance
+    (baseline scaled by machine_scale), and one per function the baseline lacks.
+    """
+    scale = machine_scale(report, baseline)
+    regressions = []
+    for size, funcs in report["results"].items():
+        for name, r in funcs.items():
+            base = baseline.get("results", {}).get(size, {}).get(name)
+            if not base or not base["median_ms"]:
+                regressions.append(f"{size} topics {name}: not in baseline")
+                continue
+            expected = base["median_ms"] * scale
+            ratio = r["median_ms"] / expected
+            if ratio > tolerance:
+                regressions.append(f"{size} topics {name}: {expected:.3f} -> {r['median_ms']:.3f} ms (x{ratio:.2f})")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--students", type=int, default=20, help="mastery sets per size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="allowed slowdown factor")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.repeat, args.students, args.seed)
+    print_table(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        print(f"\ncompared with {args.compare} ({baseline['meta'].get('commit') or 'unknown commit'}, "
+              f"machine x{machine_scale(report, baseline):.2f}):")
+        for line in regressions:
+            print("  REGRESSION", line)
+        if regressions:
+            return 1
+        print("  no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+# backend/python/benchmarks/bench_serving.py
+"""
+Throughput of the sync Flask app vs the async serving mode (asgi_app).
+
+Run from backend/python:
+    python -m benchmarks.bench_serving
+    python -m benchmarks.bench_serving --latency-ms 50 --threads 8 --concurrency 100
+
+Both modes run in-process against the memory store with a fixed per-call latency
+standing in for the Firestore round trip. The sync mode is one worker with
+--threads request threads (like gunicorn --threads); the async mode is one event
+loop with up to --concurrency requests in flight. The curriculum is loaded once
+before timing, as it is on a warm server; the login cache starts cold in each mode.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+os.environ["PAGE_STORAGE"] = "memory"
+# fixtures are loaded after import; warm up explicitly in _setup instead
+os.environ["WARM_UP"] = "0"
+
+from benchmarks.synthetic import layered_curriculum, mastery_sets  # noqa: E402
+
+
+def _setup(n_topics: int, n_students: int, seed: int):
+    import app as flask_app
+    import asgi_app
+
+    topics = layered_curriculum(n_topics, seed=seed)
+    students = {
+        f"s{i:05d}": {"name": f"Student {i}", "mastered": mastered}
+        for i, mastered in enumerate(mastery_sets(topics, n_students, seed=seed))
+    }
+    flask_app.db.client.load({
+        "topics": {t["id"]: {k: v for k, v in t.items() if k != "id"} for t in topics},
+        "students": students,
+        "users": {"t0001": {"name": "Teacher"}},
+    })
+    flask_app.curriculum.invalidate()
+    flask_app.warm_up()
+    return flask_app, asgi_app, sorted(students)
+
+
+def _requests(kind: str, student_ids: List[str], n: int) -> List[Tuple[str, str, Any]]:
+    out = []
+    for i in range(n):
+        sid = student_ids[i % len(student_ids)]
+        if kind == "path":
+            out.append(("GET", f"/students/{sid}/path", None))
+        else:
+            out.append(("POST", "/login", {"id": sid}))
+    return out
+
+
+def run_sync(flask_app, reqs, threads: int) -> List[float]:
+    client = flask_app.app.test_client()
+
+    def one(req):
+        method, path, body = req
+        start = time.perf_counter()
+        resp = client.open(path, method=method, json=body)
+        assert resp.status_code == 200, resp.status_code
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(one, reqs))
+
+
+async def _call_asgi(app, method: str, path: str, body) -> Tuple[int, float]:
+    payload = json.dumps(body).encode() if body is not None else b""
+    scope = {"type": "http", "method": method, "path": path, "query_string": b"",
+             "headers": [(b"content-type", b"application/json")]}
+    sent = {"done": False}
+    status = {}
+
+    async def receive():
+        if sent["done"]:
+            await asyncio.sleep(3600)
+        sent["done"] = True
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return status.get("code", 0), time.perf_counter() - start
+
+
+def run_async(asgi_app, reqs, concurrency: int) -> List[float]:
+    async def main():
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(req):
+            async with sem:
+                code, elapsed = await _call_asgi(asgi_app.app, *req)
+                assert code == 200, code
+                return elapsed
+
+        return await asyncio.gather(*(one(r) for r in reqs))
+
+    return asyncio.run(main())
+
+
+def _summary(latencies: List[float], wall: float) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "req_per_s": round(len(latencies) / wall, 1),
+        "p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1] * 1000, 2),
+    }
+
+
+def _timed(fn: Callable[[], List[float]]) -> Dict[str, float]:
+    start = time.perf_counter()
+    latencies = fn()
+    return _summary(latencies, time.perf_counter() - start)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated Firestore round trip")
+    parser.add_argument("--requests", type=int, default=400, help="requests per endpoint and mode")
+    parser.add_argument("--threads", type=int, default=8, help="sync mode request threads")
+    parser.add_argument("--concurrency", type=int, default=64, help="async mode requests in flight")
+    parser.add_argument("--topics", type=int, default=500)
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    flask_app, asgi_app, student_ids = _setup(args.topics, args.students, args.seed)
+    flask_app.db.client.latency = args.latency_ms / 1000
+
+    print(f"{'endpoint':<10}{'mode':<8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for kind in ("path", "login"):
+        reqs = _requests(kind, student_ids, args.requests)
+        results = {}
+        for mode, run in (("sync", lambda: run_sync(flask_app, reqs, args.threads)),
+                          ("async", lambda: run_async(asgi_app, reqs, args.concurrency))):
+            # both modes start with a cold login cache
+            flask_app.identity_cache.clear()
+            results[mode] = _timed(run)
+        for mode, r in results.items():
+            print(f"{kind:<10}{mode:<8}{r['req_per_s']:>10.1f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
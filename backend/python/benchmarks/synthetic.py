@@ -0,0 +1,64 @@
+# backend/python/benchmarks/synthetic.py
+"""
+Synthetic curricula for benchmarks.
+
+Topics are laid out in layers like the seed data: each cluster is a short chain
+of layers and most topics depend on one to three topics from the previous one or
+two layers. Everything is driven by a seeded random.Random so runs are repeatable.
+"""
+import random
+from typing import Any, Dict, List, Optional
+
+# how many prerequisites a non-root topic gets, and how often
+FAN_IN_WEIGHTS = {1: 0.5, 2: 0.35, 3: 0.15}
+
+
+def layered_curriculum(n_topics: int, seed: int = 0, layer_width: Optional[int] = None,
+                       cluster_size: int = 40) -> List[Dict[str, Any]]:
+    """
+    Return n_topics topic docs shaped like seed_topics (id, name, description,
+    prerequisites, cluster) forming a layered DAG.
+    """
+    rng = random.Random(seed)
+    width = layer_width or max(4, int(n_topics ** 0.5))
+    fan_ins = list(FAN_IN_WEIGHTS)
+    weights = list(FAN_IN_WEIGHTS.values())
+
+    topics: List[Dict[str, Any]] = []
+    layers: List[List[str]] = []
+    while len(topics) < n_topics:
+        layer = []
+        for _ in range(min(width, n_topics - len(topics))):
+            i = len(topics)
+            tid = f"topic_{i:05d}"
+            prereqs: List[str] = []
+            if layers:
+                # mostly the previous layer, sometimes one further back
+                pool = layers[-1] + (layers[-2] if len(layers) > 1 and rng.random() < 0.3 else [])
+                k = min(rng.choices(fan_ins, weights)[0], len(pool))
+                prereqs = rng.sample(pool, k)
+            topics.append({
+                "id": tid,
+                "name": f"Topic {i}",
+                "description": f"Synthetic topic {i}",
+                "prerequisites": prereqs,
+                "cluster": f"Cluster {i // cluster_size}",
+            })
+            layer.append(tid)
+        layers.append(layer)
+    return topics
+
+
+def mastery_sets(topics: List[Dict[str, Any]], count: int, seed: int = 0) -> List[List[str]]:
+    """
+    Random mastered lists: a prerequisite-closed prefix of the curriculum (how
+    students actually progress) plus a little noise from teacher overrides.
+    """
+    rng = random.Random(seed)
+    ids = [t["id"] for t in topics]
+    out = []
+    for _ in range(count):
+        prefix = ids[:rng.randint(0, len(ids))]
+        noise = rng.sample(ids, min(len(ids), rng.randint(0, 3)))
+        out.append(list(dict.fromkeys(prefix + noise)))
+    return out
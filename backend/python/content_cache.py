@@ -0,0 +1,73 @@
+# backend/python/content_cache.py
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class ContentIndex:
+    """
+    Process-wide index of the contents collection grouped by topic_id.
+    The collection is streamed once and kept until invalidate() (called by the
+    content write endpoints) or, when ttl is set, until the index is older than
+    ttl seconds (covers writes made by other workers or directly in Firestore).
+    """
+
+    def __init__(self, loader: Callable[[], List[Dict[str, Any]]], ttl: Optional[float] = None):
+        self._loader = loader
+        self._ttl = ttl or None
+        self._lock = threading.Lock()
+        self._version = 0
+        self._by_topic: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._loaded_version = -1
+        self._loaded_at = 0.0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def _is_fresh(self) -> bool:
+        if self._by_topic is None or self._loaded_version != self._version:
+            return False
+        if self._ttl and time.time() - self._loaded_at > self._ttl:
+            return False
+        return True
+
+    def _grouped(self) -> Dict[str, List[Dict[str, Any]]]:
+        if self._is_fresh():
+            return self._by_topic
+        with self._lock:
+            if self._is_fresh():
+                return self._by_topic
+            version = self._version
+            by_topic: Dict[str, List[Dict[str, Any]]] = {}
+            for doc in self._loader():
+                by_topic.setdefault(doc.get("topic_id"), []).append(doc)
+            self._by_topic, self._loaded_version, self._loaded_at = by_topic, version, time.time()
+            return by_topic
+
+    def for_topic(self, topic_id: str) -> List[Dict[str, Any]]:
+        """
+        Content docs (with "id") attached to topic_id, in collection order.
+        """
+        return list(self._grouped().get(topic_id, []))
+
+    def for_topics(self, topic_ids: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        {topic_id: content docs} for every requested id (empty list when it has none).
+        """
+        grouped = self._grouped()
+        return {tid: list(grouped.get(tid, [])) for tid in topic_ids}
+
+    def preload(self) -> int:
+        """
+        Load the index now (e.g. during warm-up); returns the number of topics with content.
+        """
+        return len(self._grouped())
+
+    def invalidate(self) -> None:
+        """
+        Drop the index; the next lookup reloads the contents collection.
+        """
+        with self._lock:
+            self._version += 1
+            self._by_topic = None
@@ -0,0 +1,186 @@
+# backend/python/curriculum_cache.py
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import networkx as nx
+
+from graph_service import build_graph_from_topics
+
+# (topic docs, graph, precomputed derived values) handed over by a CurriculumCache source
+Prebuilt = Tuple[List[Dict[str, Any]], nx.DiGraph, Dict[str, Any]]
+
+
+class CurriculumSnapshot:
+    """
+    Immutable view of the topics collection at one curriculum version.
+    Holds the raw topic docs and the DiGraph built from them. Anything else
+    that only depends on the curriculum can be memoized with derive().
+    """
+
+    def __init__(self, version: int, docs: List[Dict[str, Any]], graph: nx.DiGraph,
+                 derived: Optional[Dict[str, Any]] = None):
+        self.version = version
+        self.docs = docs
+        self.graph = graph
+        self.loaded_at = time.time()
+        # derived values that came precomputed with the docs (e.g. from a snapshot file)
+        self._derived: Dict[str, Any] = dict(derived or {})
+        # reentrant: a factory may derive() other values from the same snapshot
+        self._lock = threading.RLock()
+
+    @property
+    def etag(self) -> str:
+        """
+        Content hash of the topic docs. Unlike version it is the same in every worker
+        holding the same curriculum, so it can be handed to clients as an ETag.
+        """
+        return self.derive("etag", _docs_digest)
+
+    @property
+    def graph_tag(self) -> str:
+        """
+        Hash of the graph structure only (node ids and edges, in graph order), which is
+        all recommendations depend on; title or description edits leave it unchanged.
+        """
+        return self.derive("graph_tag", lambda s: graph_digest(s.graph))
+
+    def derive(self, key: str, factory: Callable[["CurriculumSnapshot"], Any]) -> Any:
+        """
+        Return the value cached under key, computing it with factory(snapshot) on first use.
+        """
+        try:
+            return self._derived[key]
+        except KeyError:
+            pass
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = factory(self)
+            return self._derived[key]
+
+
+def docs_digest(docs: List[Dict[str, Any]]) -> str:
+    """
+    Content hash of a list of topic docs (the snapshot etag).
+    """
+    raw = json.dumps(docs, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+
+def graph_digest(G: nx.DiGraph) -> str:
+    """
+    Structure hash of a curriculum graph (CurriculumSnapshot.graph_tag).
+    """
+    raw = json.dumps([list(G.nodes), list(G.edges)], default=str, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+
+def _docs_digest(snap: CurriculumSnapshot) -> str:
+    return docs_digest(snap.docs)
+
+
+class CurriculumCache:
+    """
+    Process-wide cache of the curriculum graph.
+    The topics collection is streamed and the graph built once; it is rebuilt only
+    after invalidate() (called by the topic write endpoints) or, when ttl is set,
+    once the snapshot is older than ttl seconds (covers writes made by other
+    workers or directly in Firestore).
+    When stamp is given (a cheap read of a value every topic write moves, e.g. the
+    stored curriculum version), it is read at most every check_interval seconds and
+    the snapshot is rebuilt as soon as it has moved; a failed read keeps the snapshot.
+    When source is given it is tried first on every rebuild: it returns
+    (docs, graph, derived values) built elsewhere, or None to use loader and build.
+    """
+
+    def __init__(self, loader: Callable[[], List[Dict[str, Any]]], ttl: Optional[float] = None,
+                 build: Callable[[List[Dict[str, Any]]], nx.DiGraph] = build_graph_from_topics,
+                 source: Optional[Callable[[], Optional[Prebuilt]]] = None,
+                 stamp: Optional[Callable[[], Any]] = None, check_interval: float = 5.0):
+        self._loader = loader
+        self._build = build
+        self._source = source
+        self._stamp = stamp
+        self._check_interval = check_interval
+        self._loaded_stamp: Any = None
+        self._checked_at = 0.0
+        self._ttl = ttl or None
+        self._lock = threading.Lock()
+        self._version = 0
+        self._snapshot: Optional[CurriculumSnapshot] = None
+        self._listeners: List[Callable[[int], None]] = []
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def add_listener(self, fn: Callable[[int], None]) -> None:
+        """
+        Call fn(new_version) whenever the version moves (invalidate, TTL expiry, moved stamp),
+        e.g. to drop caches keyed by the old curriculum. Runs under the cache lock.
+        """
+        self._listeners.append(fn)
+
+    def _bump(self) -> None:
+        self._version += 1
+        for fn in self._listeners:
+            fn(self._version)
+
+    def _is_fresh(self, snap: Optional[CurriculumSnapshot]) -> bool:
+        if snap is None or snap.version != self._version:
+            return False
+        if self._ttl and time.time() - snap.loaded_at > self._ttl:
+            return False
+        return True
+
+    def _check_due(self) -> bool:
+        return self._stamp is not None and time.time() - self._checked_at > self._check_interval
+
+    def _read_stamp(self) -> Any:
+        self._checked_at = time.time()
+        try:
+            return self._stamp()
+        except Exception as e:
+            print("curriculum stamp check failed:", e)
+            return None
+
+    def _stamp_moved(self) -> bool:
+        current = self._read_stamp()
+        return current is not None and current != self._loaded_stamp
+
+    def snapshot(self) -> CurriculumSnapshot:
+        snap = self._snapshot
+        if self._is_fresh(snap) and not self._check_due():
+            return snap
+        with self._lock:
+            snap = self._snapshot
+            if self._is_fresh(snap) and not (self._check_due() and self._stamp_moved()):
+                return snap
+            # a TTL expiry or moved stamp also moves the version so derived values never outlive their graph
+            if snap is not None and snap.version == self._version:
+                self._bump()
+            version = self._version
+            # read before the docs: a write landing in between is caught by the next check
+            if self._stamp is not None:
+                self._loaded_stamp = self._read_stamp()
+            loaded = self._source() if self._source is not None else None
+            if loaded is not None:
+                snap = CurriculumSnapshot(version, *loaded)
+            else:
+                docs = self._loader()
+                snap = CurriculumSnapshot(version, docs, self._build(docs))
+            self._snapshot = snap
+            return snap
+
+    def graph(self) -> nx.DiGraph:
+        return self.snapshot().graph
+
+    def invalidate(self) -> None:
+        """
+        Drop the current snapshot; the next read reloads the topics collection.
+        """
+        with self._lock:
+            self._bump()
+            self._snapshot = None
@@ -0,0 +1,267 @@
+# backend/python/curriculum_snapshot.py
+"""
+On-disk curriculum snapshot, so workers can build the graph without streaming topics.
+
+Run from backend/python:
+    python curriculum_snapshot.py export [curriculum.snap]
+    python curriculum_snapshot.py info [curriculum.snap]
+
+The stored curriculum version lives in meta/curriculum ("version") and is moved
+with an atomic increment by every topic write in this backend (upsert_topic,
+delete_topic, sync_topics, reset_topics). A snapshot file records the version it
+was exported at, and it is served only while that version is not older than the
+stored one.
+
+Writers that do not move the version (the node backend's topic edits and deletes,
+console edits) are caught by a content check instead: once the file has been
+trusted for verify_after seconds (the app passes CURRICULUM_CACHE_TTL), the next
+rebuild streams the topics and compares their digest with the file's. The file
+keeps being served while they match; otherwise the streamed topics are used.
+So such edits show up within one TTL, as they do without a snapshot file.
+
+The file saves the topic stream and graph build, not the other first-request
+work (indexes, payloads, content): startup is only warm with WARM_UP=1 (the
+default) as well. The stored version is still read once per rebuild.
+
+File layout (little-endian):
+    header   magic, curriculum version, node count, edge count, metadata length
+    order    int32 per node: node indexes in topological order
+    levels   int32 per node: level of each node (roots are 0)
+    edges    int32 pairs: (prerequisite index, topic index), in graph insertion order
+    metadata UTF-8 JSON {"nodes": [node ids], "docs": [topic docs as stored]}
+The file is memory-mapped; the int sections are read in place.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from typing import Any, Callable, Dict, List, Optional
+
+import networkx as nx
+
+from curriculum_cache import docs_digest
+from graph_service import assign_levels_to_graph, build_graph_from_topics, topic_node_attrs, topological_order
+
+MAGIC = b"PAGECUR1"
+HEADER = struct.Struct("<8sQIII")
+CURRICULUM_DOC = "curriculum"
+DEFAULT_PATH = "curriculum.snap"
+
+
+def stored_version(db) -> int:
+    """
+    Curriculum version recorded in meta/curriculum (0 before the first topic write).
+    """
+    snap = db.meta.document(CURRICULUM_DOC).get()
+    doc = snap.to_dict() if snap.exists else {}
+    return int(doc.get("version", 0) or 0)
+
+
+def bump_version(db, batch=None) -> None:
+    """
+    Atomically move the stored version; pass batch to commit it with the topic write.
+    """
+    ref = db.meta.document(CURRICULUM_DOC)
+    data = {"version": db.increment(1)}
+    if batch is not None:
+        batch.set(ref, data, merge=True)
+    else:
+        ref.set(data, merge=True)
+
+
+def _int32s(values) -> bytes:
+    arr = array("i", values)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def write(path: str, version: int, docs: List[Dict[str, Any]], G: nx.DiGraph) -> int:
+    """
+    Write a snapshot of docs (and the graph built from them) at version; returns its size.
+    Raises ValueError if the graph is not a DAG. The file is replaced atomically, so
+    workers holding the old one mapped keep reading it.
+    """
+    nodes = list(G.nodes)
+    index = {n: i for i, n in enumerate(nodes)}
+    order = topological_order(G)
+    levels = assign_levels_to_graph(G.copy())
+    # predecessors of each node in node order is the order build_graph_from_topics added the edges
+    edges = [(index[p], index[n]) for n in nodes for p in G.predecessors(n)]
+    meta = json.dumps({"nodes": nodes, "docs": docs}, default=str, separators=(",", ":")).encode("utf-8")
+
+    body = [
+        HEADER.pack(MAGIC, version, len(nodes), len(edges), len(meta)),
+        _int32s(index[n] for n in order),
+        _int32s(levels.get(n, 0) for n in nodes),
+        _int32s(i for edge in edges for i in edge),
+        meta,
+    ]
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".curriculum-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for part in body:
+                f.write(part)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return sum(len(part) for part in body)
+
+
+class CurriculumFile:
+    """
+    A memory-mapped snapshot file. The graph is built on first use and shared by
+    every curriculum snapshot served from this file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.version, n_nodes, n_edges, meta_len = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a curriculum snapshot")
+        if len(self._mm) != HEADER.size + 4 * (2 * n_nodes + 2 * n_edges) + meta_len:
+            raise ValueError(f"{path}: truncated curriculum snapshot")
+        offset = HEADER.size
+        self._order = self._ints(offset, n_nodes)
+        offset += 4 * n_nodes
+        self._levels = self._ints(offset, n_nodes)
+        offset += 4 * n_nodes
+        self.edge_count = n_edges
+        self._edges = self._ints(offset, 2 * n_edges)
+        offset += 8 * n_edges
+        meta = json.loads(self._mm[offset:offset + meta_len].decode("utf-8"))
+        self.nodes: List[str] = meta["nodes"]
+        self.docs: List[Dict[str, Any]] = meta["docs"]
+        self.digest = docs_digest(self.docs)
+        self._graph: Optional[nx.DiGraph] = None
+
+    def _ints(self, offset: int, count: int):
+        if sys.byteorder == "little":
+            return memoryview(self._mm)[offset:offset + 4 * count].cast("i")
+        arr = array("i", self._mm[offset:offset + 4 * count])
+        arr.byteswap()
+        return arr
+
+    def graph(self) -> nx.DiGraph:
+        if self._graph is None:
+            G = nx.DiGraph()
+            attrs = {t["id"]: topic_node_attrs(t) for t in self.docs if t.get("id")}
+            for n, level in zip(self.nodes, self._levels):
+                # prerequisites without a topic doc are bare nodes, as in build_graph_from_topics
+                G.add_node(n, **attrs.get(n, {"title": n}), level=level)
+            nodes, edges = self.nodes, self._edges
+            G.add_edges_from((nodes[edges[i]], nodes[edges[i + 1]]) for i in range(0, len(edges), 2))
+            self._graph = G
+        return self._graph
+
+    def topo_order(self) -> List[str]:
+        return [self.nodes[i] for i in self._order]
+
+    def levels(self) -> Dict[str, int]:
+        return dict(zip(self.nodes, self._levels))
+
+    def prebuilt(self):
+        """
+        (docs, graph, derived values) for CurriculumCache; derived keys match app.py.
+        """
+        return self.docs, self.graph(), {"topo_order": self.topo_order(), "levels": self.levels()}
+
+
+class SnapshotSource:
+    """
+    CurriculumCache source serving a snapshot file while it is current.
+    current_version() reads the stored version; when that read fails the file is
+    served anyway, so graph reads survive a Firestore outage. With load_docs and
+    verify_after set, the file's docs are checked against load_docs() (see the
+    module docstring) whenever it has gone unverified for verify_after seconds.
+    The file is reopened when it changes on disk (e.g. after a new export).
+    """
+
+    def __init__(self, path: str, current_version: Callable[[], int],
+                 load_docs: Optional[Callable[[], List[Dict[str, Any]]]] = None,
+                 build: Callable[[List[Dict[str, Any]]], nx.DiGraph] = build_graph_from_topics,
+                 verify_after: Optional[float] = None):
+        self.path = path
+        self._current_version = current_version
+        self._load_docs = load_docs
+        self._build = build
+        self._verify_after = verify_after or None
+        self._file: Optional[CurriculumFile] = None
+        self._mtime = None
+        self._verified_at = 0.0
+
+    def _open(self) -> Optional[CurriculumFile]:
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return self._file
+        if mtime != self._mtime:
+            try:
+                self._file = CurriculumFile(self.path)
+                # a freshly exported file is trusted for one verify_after period
+                self._verified_at = time.time()
+            except (OSError, ValueError) as e:
+                print("curriculum snapshot error:", e)
+            self._mtime = mtime
+        return self._file
+
+    def load(self) -> Optional[CurriculumFile]:
+        """
+        Open the file now (e.g. at startup); returns None when there is no usable file.
+        """
+        return self._open()
+
+    def __call__(self):
+        file = self._open()
+        if file is None:
+            return None
+        try:
+            current = self._current_version()
+        except Exception as e:
+            print("curriculum version check failed, serving the snapshot file:", e)
+            return file.prebuilt()
+        if file.version < current:
+            return None
+        if self._load_docs is not None and self._verify_after and time.time() - self._verified_at > self._verify_after:
+            docs = self._load_docs()
+            if docs_digest(docs) != file.digest:
+                # edited by a writer that does not move the version; the stream is already paid for
+                return docs, self._build(docs), {}
+            self._verified_at = time.time()
+        return file.prebuilt()
+
+
+def export(db, path: str = DEFAULT_PATH) -> Dict[str, Any]:
+    # version first: a topic write landing in between leaves the file marked older, never newer
+    version = stored_version(db)
+    docs = [{"id": d.id, **d.to_dict()} for d in db.topics.stream()]
+    size = write(path, version, docs, build_graph_from_topics(docs))
+    return {"path": path, "version": version, "topics": len(docs), "bytes": size}
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in ("export", "info") or len(argv) > 2:
+        print("usage: python curriculum_snapshot.py export|info [path]")
+        return 2
+    path = argv[1] if len(argv) > 1 else DEFAULT_PATH
+    if argv[0] == "export":
+        from storage import get_storage
+        print("✅ Curriculum snapshot written:", export(get_storage(), path))
+        return 0
+    file = CurriculumFile(path)
+    print({"path": path, "version": file.version, "nodes": len(file.nodes),
+           "edges": file.edge_count, "topics": len(file.docs)})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+# backend/python/dashboard_stats.py
+"""
+Counters behind /dashboard/summary.
+
+students_total and topic_count are Firestore count() aggregations, so they are
+always exact whoever wrote the collections. PASS/FAIL depend on each student's
+scores and cannot be counted server-side: they live in one summary document
+(meta/dashboard_summary), are moved with atomic increments by the student write
+endpoints and are recomputed with a full scan every REBUILD_INTERVAL seconds,
+which corrects drift from writes that bypass this API (the node backend, console
+edits) and from concurrent first writes to the same student.
+`python dashboard_stats.py rebuild` recomputes them right away.
+"""
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+SUMMARY_DOC = "dashboard_summary"
+COUNTERS = ("students_total", "students_pass", "students_fail", "topic_count")
+# counters kept in the summary doc; the totals are counted on read
+STORED_COUNTERS = ("students_pass", "students_fail")
+# only the fields student_status reads
+STATUS_FIELDS = ["score", "final", "scores.general", "finals.general"]
+REBUILD_INTERVAL = float(os.getenv("DASHBOARD_REBUILD_INTERVAL", 3600) or 0)
+
+_rebuild_lock = threading.Lock()
+
+
+def student_status(doc: Dict[str, Any]) -> Tuple[Any, Any, str]:
+    """
+    Return (total_score, total_final, status) for a student doc; status is PASS, FAIL or "".
+    """
+    total_score = doc.get("score") or (doc.get("scores", {}).get("general") if doc.get("scores") else 0)
+    total_final = doc.get("final") or (doc.get("finals", {}).get("general") if doc.get("finals") else 0)
+    status = ""
+    if total_final:
+        status = "PASS" if total_score >= (total_final / 2) else "FAIL"
+    return total_score, total_final, status
+
+
+def merged_doc(before: Optional[Dict[str, Any]], update: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Doc as stored after set(update, merge=True) on before (nested maps merge too).
+    """
+    out = dict(before or {})
+    for k, v in update.items():
+        if isinstance(v, dict) and isinstance(out.get(k), dict):
+            out[k] = merged_doc(out[k], v)
+        else:
+            out[k] = v
+    return out
+
+
+def _student_counts(doc: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    if doc is None:
+        return {"students_pass": 0, "students_fail": 0}
+    status = student_status(doc)[2]
+    return {
+        "students_pass": int(status == "PASS"),
+        "students_fail": int(status == "FAIL"),
+    }
+
+
+def student_delta(before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Counter changes for one student doc going from before to after (None = no doc).
+    """
+    old, new = _student_counts(before), _student_counts(after)
+    return {k: new[k] - old[k] for k in new}
+
+
+def _summary_ref(db):
+    return db.meta.document(SUMMARY_DOC)
+
+
+def apply_delta(db, delta: Dict[str, int]) -> None:
+    """
+    Atomically add delta to the stored PASS/FAIL counters (zero entries are skipped).
+    """
+    changes = {k: db.increment(v) for k, v in delta.items() if v and k in STORED_COUNTERS}
+    if changes:
+        _summary_ref(db).set(changes, merge=True)
+
+
+def rebuild(db) -> Dict[str, int]:
+    """
+    Recompute the PASS/FAIL counters with a full scan of students and store them.
+    """
+    counts = {k: 0 for k in STORED_COUNTERS}
+    for d in db.students.select(STATUS_FIELDS).stream():
+        for k, v in _student_counts(d.to_dict()).items():
+            counts[k] += v
+    # the marker tells a full rebuild apart from a doc created by a stray increment
+    _summary_ref(db).set({**counts, "rebuilt": True, "rebuilt_at": time.time()})
+    return counts
+
+
+def _rebuild_in_background(db) -> None:
+    if not _rebuild_lock.acquire(blocking=False):
+        return
+
+    def run():
+        try:
+            rebuild(db)
+        except Exception as e:
+            print("dashboard rebuild error:", e)
+        finally:
+            _rebuild_lock.release()
+
+    threading.Thread(target=run, name="dashboard-rebuild", daemon=True).start()
+
+
+def read_summary(db) -> Dict[str, int]:
+    """
+    All counters. The PASS/FAIL counters are rebuilt on first use, and in the
+    background once the last rebuild is older than REBUILD_INTERVAL.
+    """
+    snap = _summary_ref(db).get()
+    doc = snap.to_dict() if snap.exists else {}
+    if not doc.get("rebuilt"):
+        doc = rebuild(db)
+    elif REBUILD_INTERVAL and time.time() - float(doc.get("rebuilt_at") or 0) > REBUILD_INTERVAL:
+        _rebuild_in_background(db)
+    summary = {k: int(doc.get(k, 0) or 0) for k in STORED_COUNTERS}
+    summary["students_total"] = db.count(db.students)
+    summary["topic_count"] = db.count(db.topics)
+    return {k: summary[k] for k in COUNTERS}
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        print("usage: python dashboard_stats.py rebuild")
+        sys.exit(2)
+    from storage import get_storage
+    print("✅ Dashboard PASS/FAIL counters rebuilt:", rebuild(get_storage()))
@@ -31,3 +31,10 @@ def get_client():
                     raise RuntimeError("No valid Firebase credentials found. Set SERVICE_ACCOUNT_JSON or GOOGLE_APPLICATION_CREDENTIALS.") from e
 
     return firestore.client()
+
+def get_async_client():
+    # AsyncClient with the same credentials, for the async serving mode (asgi_app.py)
+    from google.cloud.firestore import AsyncClient
+    get_client()  # initializes the default firebase app
+    app = firebase_admin.get_app()
+    return AsyncClient(project=app.project_id, credentials=app.credential.get_credential())
@@ -1,7 +1,22 @@
 # backend/python/graph_service.py
-from typing import Iterable, List, Dict, Any, Optional
+from collections import deque
+from itertools import islice
+from typing import Iterable, List, Dict, Any, Optional, Sequence, Set
 import networkx as nx
 
+def topic_node_attrs(t: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Node metadata for a topic doc, as stored on the curriculum graph.
+    """
+    tid = t.get("id") or t.get("doc_id")
+    return {
+        "name": t.get("name") or t.get("title") or tid,
+        "title": t.get("title") or t.get("name") or tid,
+        "description": t.get("description", ""),
+        "cluster": t.get("cluster", "Uncategorized"),
+        "prerequisites": t.get("prerequisites") or [],
+    }
+
 def build_graph_from_topics(topics: Iterable[Dict[str, Any]]) -> nx.DiGraph:
     """
     Build a directed graph from topic data.
@@ -20,20 +35,15 @@ def build_graph_from_topics(topics: Iterable[Dict[str, Any]]) -> nx.DiGraph:
             continue
 
         # Add node with metadata
-        G.add_node(tid, **{
-            "name": t.get("name") or t.get("title") or tid,
-            "title": t.get("title") or t.get("name") or tid,
-            "description": t.get("description", ""),
-            "cluster": t.get("cluster", "Uncategorized"),
-            "prerequisites": t.get("prerequisites", []),
-        })
+        G.add_node(tid, **topic_node_attrs(t))
 
     # Add edges from prerequisites → topic
     for t in topics:
         tid = t.get("id") or t.get("doc_id")
         if not tid:
             continue
-        for p in t.get("prerequisites", []):
+        # "or []": a doc stored with prerequisites null must not break every curriculum read
+        for p in t.get("prerequisites") or []:
             if not p or p == tid:
                 continue
             if p not in G:
@@ -43,18 +53,53 @@ def build_graph_from_topics(topics: Iterable[Dict[str, Any]]) -> nx.DiGraph:
     return G
 
 
-def validate_dag(G: nx.DiGraph) -> Optional[List[List[str]]]:
+def validate_dag(G: nx.DiGraph, max_cycles: Optional[int] = None) -> Optional[List[List[str]]]:
     """
     Return None if DAG (no cycles). If cycles exist, return list of cycles (each cycle is list of nodes).
+    max_cycles: stop after reporting this many cycles (None = enumerate all, which can be exponential).
     """
     try:
-        cycles = list(nx.simple_cycles(G))
+        # linear-time check first; only enumerate when there is something to report
+        if nx.is_directed_acyclic_graph(G):
+            return None
+        cycles = list(islice(nx.simple_cycles(G), max_cycles))
         if cycles:
             return cycles
         return None
     except Exception:
         return [["error"]]
 
+def find_cycle_from_edit(G: nx.DiGraph, topic_id: str, prerequisites: Iterable[str]) -> Optional[List[str]]:
+    """
+    Check whether giving topic_id these prerequisites would close a cycle in G.
+    A new edge p -> topic_id closes a cycle iff p is already reachable from topic_id,
+    so only the descendants of the edited topic are searched.
+    Return the cycle (topic_id, ..., p, topic_id) or None.
+    """
+    targets = {p for p in (prerequisites or []) if p and p != topic_id}
+    if not targets or topic_id not in G:
+        return None
+
+    parent: Dict[str, Optional[str]] = {topic_id: None}
+    queue = deque([topic_id])
+    while queue:
+        u = queue.popleft()
+        for v in G.successors(u):
+            if v in parent:
+                continue
+            parent[v] = u
+            if v in targets:
+                cycle = [topic_id]
+                node = v
+                while node != topic_id:
+                    cycle.append(node)
+                    node = parent[node]
+                cycle[1:] = reversed(cycle[1:])
+                cycle.append(topic_id)
+                return cycle
+            queue.append(v)
+    return None
+
 def recommend_next_topics(G: nx.DiGraph, mastered: Iterable[str], limit: int = 10) -> List[str]:
     """
     Recommendation strategy:
@@ -90,34 +135,254 @@ def recommend_next_topics(G: nx.DiGraph, mastered: Iterable[str], limit: int = 1
         return sources[:limit]
 
     # 3) Find nearest unmastered node reachable from any mastered node
-    best_path = None
-    best_len = None
-
     unmastered_nodes = [n for n in topo if n not in mastered_set]
 
-    for target in unmastered_nodes:
-        # For each mastered node, check if there is a path to target
-        for m in mastered_set:
-            try:
-                if nx.has_path(G, m, target):
-                    path = nx.shortest_path(G, source=m, target=target)
-                    # filter out already mastered nodes (we only need the remaining sequence)
-                    remaining = [p for p in path if p not in mastered_set]
-                    if not remaining:
-                        continue
-                    l = len(remaining)
-                    if best_len is None or l < best_len:
-                        best_len = l
-                        best_path = remaining
-            except nx.NetworkXNoPath:
-                continue
-
+    best_path = _nearest_remaining_path(G, topo, mastered_set)
     if best_path:
         return best_path[:limit]
 
     # 4) Fallback: return earliest unmastered nodes in topo order
     return unmastered_nodes[:limit]
 
+def _nearest_remaining_path(G: nx.DiGraph, topo: List[str], mastered_set: Set[str]) -> Optional[List[str]]:
+    """
+    Single multi-source search seeded from every mastered node.
+    Path cost is the number of unmastered nodes on it (stepping onto a mastered node is free),
+    so one 0-1 BFS gives the minimal remaining sequence for every target at once.
+    Ties go to the earliest target in topological order, like the old per-pair scan.
+    """
+    dist: Dict[str, int] = {}
+    parent: Dict[str, Optional[str]] = {}
+    queue = deque()
+    for m in topo:
+        if m in mastered_set:
+            dist[m] = 0
+            parent[m] = None
+            queue.append(m)
+
+    while queue:
+        u = queue.popleft()
+        for v in G.successors(u):
+            step = 0 if v in mastered_set else 1
+            d = dist[u] + step
+            if v in dist and dist[v] <= d:
+                continue
+            dist[v] = d
+            parent[v] = u
+            if step:
+                queue.append(v)
+            else:
+                queue.appendleft(v)
+
+    best = None
+    for n in topo:
+        if n in mastered_set or n not in dist:
+            continue
+        if best is None or dist[n] < dist[best]:
+            best = n
+    if best is None:
+        return None
+
+    path = []
+    node = best
+    while node is not None:
+        if node not in mastered_set:
+            path.append(node)
+        node = parent[node]
+    path.reverse()
+    return path
+
+class CurriculumIndex:
+    """
+    Compact, read-only form of a curriculum DiGraph for the recommendation hot path.
+    Topics get integer ids in a cached topological order and each topic's prerequisites
+    are one int bitmask, so "all prerequisites mastered" is a single AND per topic.
+    Build once per curriculum version; raises ValueError if the graph is not a DAG.
+    """
+
+    __slots__ = ("order", "ids", "pred_masks", "successors")
+
+    def __init__(self, G: nx.DiGraph, order: Optional[Sequence[str]] = None):
+        # order: a topological order of G computed earlier (e.g. read from a snapshot file)
+        if order is None:
+            order = topological_order(G)
+        ids = {n: i for i, n in enumerate(order)}
+        pred_masks = []
+        for n in order:
+            mask = 0
+            for p in G.predecessors(n):
+                mask |= 1 << ids[p]
+            pred_masks.append(mask)
+
+        self.order = tuple(order)
+        self.ids = ids
+        self.pred_masks = tuple(pred_masks)
+        self.successors = tuple(tuple(ids[v] for v in G.successors(n)) for n in order)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def mask_of(self, topics: Iterable[str]) -> int:
+        """
+        Bitmask of the given topic ids (unknown ids are ignored).
+        """
+        mask = 0
+        ids = self.ids
+        for t in topics:
+            i = ids.get(t)
+            if i is not None:
+                mask |= 1 << i
+        return mask
+
+    def recommend(self, mastered: Iterable[str], limit: int = 10) -> List[str]:
+        """
+        Same strategy and output as recommend_next_topics, on the compact form.
+        """
+        mastered_set = set(mastered or [])
+        mastered_ids = {self.ids[t] for t in mastered_set if t in self.ids}
+        mastered_mask = 0
+        for i in mastered_ids:
+            mastered_mask |= 1 << i
+        order = self.order
+
+        # 1) Candidates unlocked now (prereqs subset of mastered)
+        unlocked = []
+        for i, pred_mask in enumerate(self.pred_masks):
+            if i in mastered_ids:
+                continue
+            if pred_mask & mastered_mask == pred_mask:
+                unlocked.append(order[i])
+                # a limit below 1 slices the full list, as in recommend_next_topics
+                if 0 < limit <= len(unlocked):
+                    break
+        if unlocked:
+            return unlocked[:limit]
+
+        unmastered = [i for i in range(len(order)) if i not in mastered_ids]
+
+        # 2) If nothing unlocked and no mastered topics -> recommend source nodes (start here)
+        if not mastered_set:
+            return [order[i] for i, m in enumerate(self.pred_masks) if not m][:limit]
+
+        # 3) Find nearest unmastered node reachable from any mastered node
+        best_path = self._nearest_remaining_path(mastered_ids)
+        if best_path:
+            return [order[i] for i in best_path[:limit]]
+
+        # 4) Fallback: return earliest unmastered nodes in topo order
+        return [order[i] for i in unmastered[:limit]]
+
+    def _nearest_remaining_path(self, mastered_ids: Set[int]) -> Optional[List[int]]:
+        # integer-id port of the module-level _nearest_remaining_path
+        n = len(self.order)
+        dist: List[Optional[int]] = [None] * n
+        parent: List[int] = [-1] * n
+        queue = deque()
+        for i in range(n):
+            if i in mastered_ids:
+                dist[i] = 0
+                queue.append(i)
+
+        while queue:
+            u = queue.popleft()
+            for v in self.successors[u]:
+                step = 0 if v in mastered_ids else 1
+                d = dist[u] + step
+                if dist[v] is not None and dist[v] <= d:
+                    continue
+                dist[v] = d
+                parent[v] = u
+                if step:
+                    queue.append(v)
+                else:
+                    queue.appendleft(v)
+
+        best = None
+        for i in range(n):
+            if i in mastered_ids or dist[i] is None:
+                continue
+            if best is None or dist[i] < dist[best]:
+                best = i
+        if best is None:
+            return None
+
+        path = []
+        node = best
+        while node != -1:
+            if not node in mastered_ids:
+                path.append(node)
+            node = parent[node]
+        path.reverse()
+        return path
+
+class ReachabilityIndex:
+    """
+    Transitive closure of a CurriculumIndex as bitset rows in its topological order:
+    ancestors[i] has a bit for every topic that must come before topic i, and
+    descendants[i] one for every topic that depends on it, directly or not.
+    Queries are a few AND/NOT operations on those ints instead of graph walks.
+    Memory is O(n^2) bits in the worst case (about 25 MB for 10k topics).
+    """
+
+    __slots__ = ("index", "ancestors", "descendants")
+
+    def __init__(self, index: CurriculumIndex):
+        n = len(index)
+        ancestors = [0] * n
+        # topological order: every predecessor's row is complete before it is copied
+        for u in range(n):
+            row = ancestors[u] | (1 << u)
+            for v in index.successors[u]:
+                ancestors[v] |= row
+        descendants = [0] * n
+        for u in range(n - 1, -1, -1):
+            row = 0
+            for v in index.successors[u]:
+                row |= descendants[v] | (1 << v)
+            descendants[u] = row
+
+        self.index = index
+        self.ancestors = tuple(ancestors)
+        self.descendants = tuple(descendants)
+
+    def path_to(self, target: str, mastered: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        Unmastered ancestors of target in topological order, each as
+        {"id", "unlocks", "ready"}: unlocks counts the unmastered topics downstream of
+        it, ready is True when all of its direct prerequisites are mastered.
+        Raises KeyError for an unknown target.
+        """
+        index = self.index
+        t = index.ids[target]
+        mastered_mask = index.mask_of(mastered or [])
+        remaining = self.ancestors[t] & ~mastered_mask
+        out = []
+        while remaining:
+            low = remaining & -remaining
+            i = low.bit_length() - 1
+            remaining ^= low
+            out.append({
+                "id": index.order[i],
+                "unlocks": bin(self.descendants[i] & ~mastered_mask).count("1"),
+                "ready": index.pred_masks[i] & ~mastered_mask == 0,
+            })
+        return out
+
+    def depends_on(self, topic: str, prerequisite: str) -> bool:
+        """
+        True when prerequisite must be mastered (directly or not) before topic.
+        """
+        return bool(self.ancestors[self.index.ids[topic]] >> self.index.ids[prerequisite] & 1)
+
+def topological_order(G: nx.DiGraph) -> List[str]:
+    """
+    Nodes of G in topological order; raises ValueError if G is not a DAG.
+    """
+    try:
+        return list(nx.topological_sort(G))
+    except nx.NetworkXUnfeasible:
+        raise ValueError("Curriculum graph must be a DAG")
+
 def nodes_with_titles(G: nx.DiGraph) -> List[Dict[str, Any]]:
     """
     Return list of nodes as dicts {id, title, indegree, outdegree, prerequisites}
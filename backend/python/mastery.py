@@ -0,0 +1,121 @@
+# backend/python/mastery.py
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+
+def _to_floats(values: List[Any]) -> np.ndarray:
+    """
+    Parse values the way float() does; anything float() rejects becomes NaN
+    (NaN never passes the mastery comparison, which matches skipping the value).
+    """
+    try:
+        arr = np.asarray(values, dtype=float)
+        if arr.shape == (len(values),):
+            return arr
+    except Exception:
+        pass
+    out = np.empty(len(values), dtype=float)
+    for i, v in enumerate(values):
+        try:
+            out[i] = float(v)
+        except Exception:
+            out[i] = np.nan
+    return out
+
+
+def student_mastered(student: Dict[str, Any]) -> List[str]:
+    """
+    Mastered topic ids of a student doc.
+    Priority: explicit 'mastered' list -> scores+finals mapping -> empty.
+    """
+    mastered = list(student.get("mastered", []) or [])
+    if not mastered and student.get("scores"):
+        scores = student.get("scores", {})        # e.g. {"fractions": 31}
+        finals = student.get("finals", {})        # e.g. {"fractions": 60}
+        for topic_id, sc in scores.items():
+            max_sc = finals.get(topic_id, student.get("final") or 0)
+            if max_sc and sc >= (max_sc / 2):
+                mastered.append(topic_id)
+    return mastered
+
+
+def compute_mastered_from_scores(scores: Dict[str, Any], finals: Dict[str, Any], threshold: float = 0.5) -> List[str]:
+    """
+    Return list of topic_ids considered mastered based on scores and finals.
+    threshold: fraction (0.5 = half of final)
+    """
+    mastered = []
+    for topic_id, sc in (scores or {}).items():
+        try:
+            sc_val = float(sc)
+        except Exception:
+            continue
+        max_sc = None
+        if finals and topic_id in finals:
+            try:
+                max_sc = float(finals[topic_id])
+            except Exception:
+                max_sc = None
+        # if no topic-specific final, don't assume global final unless provided elsewhere
+        if max_sc is None:
+            # skip if no max known (cannot decide)
+            continue
+        if max_sc > 0 and sc_val >= (threshold * max_sc):
+            mastered.append(topic_id)
+    # unique
+    return list(dict.fromkeys(mastered))
+
+
+def compute_mastered_batch(
+    students: Sequence[Tuple[Dict[str, Any], Dict[str, Any]]],
+    threshold: Union[float, Sequence[float]] = 0.5,
+) -> List[List[str]]:
+    """
+    Batched compute_mastered_from_scores.
+    students: sequence of (scores, finals) pairs.
+    threshold: one fraction for everyone or one per student.
+    Scores and finals are packed into student x topic matrices (NaN where missing or
+    not numeric) and the threshold is applied in one vectorized step per block of
+    students with the same topics. Returns one mastered list per student, in that
+    student's scores order, same as the per-student function.
+    """
+    n = len(students)
+    thresholds = np.broadcast_to(np.asarray(threshold, dtype=float), (n,))
+    out: List[List[str]] = [[] for _ in range(n)]
+
+    # students sharing the same topic columns (the usual case for one class upload)
+    # become one block of the student x topic matrix
+    blocks: Dict[Tuple[str, ...], List[int]] = {}
+    for r, (scores, _) in enumerate(students):
+        blocks.setdefault(tuple(scores or {}), []).append(r)
+
+    for keys, rows in blocks.items():
+        if not keys:
+            continue
+        width = len(keys)
+        getter = itemgetter(*keys)
+
+        score_vals = list(chain.from_iterable((students[r][0] or {}).values() for r in rows))
+        final_vals: List[Any] = []
+        for r in rows:
+            finals = students[r][1] or {}
+            try:
+                vals = getter(finals)
+                final_vals.extend(vals if width > 1 else (vals,))
+            except KeyError:
+                # missing finals stay None -> NaN, i.e. "no max known"
+                final_vals.extend([finals.get(k) for k in keys])
+
+        S = _to_floats(score_vals).reshape(len(rows), width)
+        F = _to_floats(final_vals).reshape(len(rows), width)
+        thr = thresholds[rows][:, None]
+        with np.errstate(invalid="ignore"):
+            mastered = (F > 0) & (S >= thr * F)
+
+        names = np.array(keys, dtype=object)
+        for i, r in enumerate(rows):
+            out[r] = names[mastered[i]].tolist()
+    return out
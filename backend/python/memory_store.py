@@ -0,0 +1,499 @@
+# backend/python/memory_store.py
+"""
+In-memory stand-in for the Firestore client.
+
+Covers the part of the google-cloud-firestore API the backend uses: collection()/
+document(), get(), set(merge=True), update(), delete(), stream(), where()/select()/
+order_by()/start_after()/limit(), count() aggregations, get_all(), batch() and
+transaction() with @transactional, plus the Increment and ArrayUnion transforms. Documents are deep-copied on the way in and out, so callers
+see the same isolation they get from the real client.
+
+An optional per-call latency makes the hot paths behave like they do against a
+remote Firestore when profiling or load-testing locally. AsyncMemoryClient is the
+AsyncClient counterpart over the same data, for the async serving mode.
+"""
+import asyncio
+import copy
+import json
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class NotFound(Exception):
+    """Raised by update() on a missing document, like google.api_core NotFound."""
+
+
+class Increment:
+    def __init__(self, value):
+        self.value = value
+
+
+class ArrayUnion:
+    def __init__(self, values):
+        self.values = list(values)
+
+
+class ArrayRemove:
+    def __init__(self, values):
+        self.values = list(values)
+
+
+DELETE_FIELD = object()
+
+
+def _get_path(doc: Dict[str, Any], path: str) -> Tuple[bool, Any]:
+    cur: Any = doc
+    for part in path.split("."):
+        if not isinstance(cur, dict) or part not in cur:
+            return False, None
+        cur = cur[part]
+    return True, cur
+
+
+def _apply(target: Dict[str, Any], key: str, value: Any) -> None:
+    """Write one value (or transform) into target[key]."""
+    if value is DELETE_FIELD:
+        target.pop(key, None)
+    elif isinstance(value, Increment):
+        current = target.get(key)
+        target[key] = (current if isinstance(current, (int, float)) else 0) + value.value
+    elif isinstance(value, ArrayUnion):
+        current = target.get(key) if isinstance(target.get(key), list) else []
+        target[key] = current + [v for v in value.values if v not in current]
+    elif isinstance(value, ArrayRemove):
+        current = target.get(key) if isinstance(target.get(key), list) else []
+        target[key] = [v for v in current if v not in value.values]
+    else:
+        target[key] = copy.deepcopy(value)
+
+
+def _merge(target: Dict[str, Any], data: Dict[str, Any]) -> None:
+    # set(..., merge=True): nested maps merge field by field
+    for k, v in data.items():
+        if isinstance(v, dict) and isinstance(target.get(k), dict):
+            _merge(target[k], v)
+        elif isinstance(v, dict):
+            target[k] = {}
+            _merge(target[k], v)
+        else:
+            _apply(target, k, v)
+
+
+def _resolve_transforms(data: Dict[str, Any]) -> Dict[str, Any]:
+    # plain set() replaces the doc, but transforms still apply to the new (empty) doc
+    out: Dict[str, Any] = {}
+    _merge(out, data)
+    return out
+
+
+def _project(doc: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for path in fields:
+        found, value = _get_path(doc, path)
+        if not found:
+            continue
+        parts = path.split(".")
+        cur = out
+        for part in parts[:-1]:
+            cur = cur.setdefault(part, {})
+        cur[parts[-1]] = copy.deepcopy(value)
+    return out
+
+
+_OPS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "in": lambda a, b: a in b,
+    "not-in": lambda a, b: a not in b,
+    "array-contains": lambda a, b: isinstance(a, list) and b in a,
+    "array-contains-any": lambda a, b: isinstance(a, list) and any(x in a for x in b),
+}
+
+
+class MemoryDocumentSnapshot:
+    def __init__(self, reference: "MemoryDocumentReference", data: Optional[Dict[str, Any]]):
+        self.reference = reference
+        self._data = data
+
+    @property
+    def id(self) -> str:
+        return self.reference.id
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return copy.deepcopy(self._data)
+
+    def get(self, field_path: str) -> Any:
+        found, value = _get_path(self._data or {}, field_path)
+        if not found:
+            raise KeyError(field_path)
+        return copy.deepcopy(value)
+
+
+class MemoryDocumentReference:
+    def __init__(self, client: "MemoryClient", collection: str, doc_id: str):
+        self._client = client
+        self._collection = collection
+        self.id = doc_id
+
+    @property
+    def path(self) -> str:
+        return f"{self._collection}/{self.id}"
+
+    @property
+    def parent(self) -> "MemoryCollection":
+        return self._client.collection(self._collection)
+
+    def get(self, field_paths=None, transaction=None) -> MemoryDocumentSnapshot:
+        self._client._wait()
+        return self._client._read(self)
+
+    def set(self, document_data: Dict[str, Any], merge: bool = False) -> None:
+        self._client._wait()
+        self._client._write([("set", self, document_data, merge)])
+
+    def update(self, field_updates: Dict[str, Any]) -> None:
+        self._client._wait()
+        self._client._write([("update", self, field_updates, False)])
+
+    def delete(self) -> None:
+        self._client._wait()
+        self._client._write([("delete", self, None, False)])
+
+
+class MemoryQuery:
+    def __init__(self, client: "MemoryClient", collection: str, filters=(), fields=None,
+                 order=None, after=None, limit_to=None):
+        self._client = client
+        self._collection = collection
+        self._filters = tuple(filters)
+        self._fields = fields
+        self._order = order
+        self._after = after
+        self._limit = limit_to
+
+    def _copy(self, **changes) -> "MemoryQuery":
+        state = dict(filters=self._filters, fields=self._fields, order=self._order,
+                     after=self._after, limit_to=self._limit)
+        state.update(changes)
+        return MemoryQuery(self._client, self._collection, **state)
+
+    def where(self, field_path: str, op_string: str, value: Any) -> "MemoryQuery":
+        if op_string not in _OPS:
+            raise ValueError(f"Unsupported operator: {op_string}")
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def select(self, field_paths: Iterable[str]) -> "MemoryQuery":
+        return self._copy(fields=list(field_paths))
+
+    def order_by(self, field_path: str, direction: str = "ASCENDING") -> "MemoryQuery":
+        return self._copy(order=(field_path, direction == "DESCENDING"))
+
+    def start_after(self, document_fields) -> "MemoryQuery":
+        if isinstance(document_fields, MemoryDocumentSnapshot):
+            value = document_fields.id if self._order and self._order[0] == "__name__" \
+                else _get_path(document_fields.to_dict() or {}, self._order[0])[1]
+        else:
+            value = document_fields[self._order[0]] if self._order else None
+        if isinstance(value, MemoryDocumentReference):
+            value = value.id
+        return self._copy(after=value)
+
+    def limit(self, count: int) -> "MemoryQuery":
+        return self._copy(limit_to=count)
+
+    def _sort_key(self, item):
+        doc_id, doc = item
+        if not self._order or self._order[0] == "__name__":
+            return doc_id
+        return _get_path(doc, self._order[0])[1]
+
+    def stream(self, transaction=None) -> Iterator[MemoryDocumentSnapshot]:
+        self._client._wait()
+        return iter(self._snapshots())
+
+    def _snapshots(self) -> List[MemoryDocumentSnapshot]:
+        # materialize under the lock so concurrent writes never show up half-applied
+        with self._client._lock:
+            return [
+                MemoryDocumentSnapshot(
+                    MemoryDocumentReference(self._client, self._collection, doc_id),
+                    _project(doc, self._fields) if self._fields is not None else copy.deepcopy(doc),
+                )
+                for doc_id, doc in self._matching()
+            ]
+
+    def _matching(self) -> List[Tuple[str, Dict[str, Any]]]:
+        docs = list(self._client._data.get(self._collection, {}).items())
+        for field, op, value in self._filters:
+            test = _OPS[op]
+            docs = [(i, d) for i, d in docs if _get_path(d, field)[0] and test(_get_path(d, field)[1], value)]
+        if self._order and self._order[0] != "__name__":
+            docs = [(i, d) for i, d in docs if _get_path(d, self._order[0])[0]]
+        reverse = bool(self._order and self._order[1])
+        docs.sort(key=self._sort_key, reverse=reverse)
+        if self._after is not None:
+            if reverse:
+                docs = [(i, d) for i, d in docs if self._sort_key((i, d)) < self._after]
+            else:
+                docs = [(i, d) for i, d in docs if self._sort_key((i, d)) > self._after]
+        if self._limit is not None:
+            docs = docs[:self._limit]
+        return docs
+
+    def get(self, transaction=None) -> List[MemoryDocumentSnapshot]:
+        return list(self.stream())
+
+    def count(self, alias: Optional[str] = None) -> "MemoryAggregationQuery":
+        return MemoryAggregationQuery(self, alias or "field_1")
+
+
+class MemoryAggregationResult:
+    def __init__(self, alias: str, value: int):
+        self.alias = alias
+        self.value = value
+
+
+class MemoryAggregationQuery:
+    """count() over a query; get() returns [[result]] like the Firestore AggregationQuery."""
+
+    def __init__(self, query: MemoryQuery, alias: str):
+        self._query = query
+        self._alias = alias
+
+    def get(self, transaction=None) -> List[List[MemoryAggregationResult]]:
+        self._query._client._wait()
+        with self._query._client._lock:
+            return [[MemoryAggregationResult(self._alias, len(self._query._matching()))]]
+
+
+class MemoryCollection(MemoryQuery):
+    def __init__(self, client: "MemoryClient", name: str):
+        super().__init__(client, name)
+
+    @property
+    def id(self) -> str:
+        return self._collection
+
+    def document(self, document_id: Optional[str] = None) -> MemoryDocumentReference:
+        return MemoryDocumentReference(self._client, self._collection, document_id or uuid.uuid4().hex[:20])
+
+
+class MemoryWriteBatch:
+    """Writes are buffered and applied atomically on commit(), like a WriteBatch."""
+
+    def __init__(self, client: "MemoryClient"):
+        self._client = client
+        self._ops: List[tuple] = []
+
+    def set(self, reference, document_data, merge=False):
+        self._ops.append(("set", reference, document_data, merge))
+
+    def update(self, reference, field_updates):
+        self._ops.append(("update", reference, field_updates, False))
+
+    def delete(self, reference):
+        self._ops.append(("delete", reference, None, False))
+
+    def commit(self):
+        self._client._wait()
+        self._client._write(self._ops)
+        self._ops = []
+
+    def __len__(self):
+        return len(self._ops)
+
+
+class MemoryTransaction(MemoryWriteBatch):
+    """
+    Writes are buffered like a batch. transactional() holds the client lock from the
+    first read to the commit, so a transaction never has to be retried.
+    """
+
+
+def transactional(fn):
+    """
+    Same contract as google.cloud.firestore.transactional: fn(transaction, *args)
+    runs inside the transaction and its buffered writes commit when it returns.
+    """
+    def run(transaction: MemoryTransaction, *args, **kwargs):
+        with transaction._client._lock:
+            result = fn(transaction, *args, **kwargs)
+            transaction.commit()
+            return result
+    return run
+
+
+class MemoryClient:
+    """
+    Process-local Firestore stand-in. latency (seconds) is slept once per RPC.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self._data: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._lock = threading.RLock()
+        self.latency = latency
+
+    def _wait(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    def collection(self, name: str) -> MemoryCollection:
+        return MemoryCollection(self, name)
+
+    def batch(self) -> MemoryWriteBatch:
+        return MemoryWriteBatch(self)
+
+    def transaction(self) -> MemoryTransaction:
+        return MemoryTransaction(self)
+
+    def get_all(self, references: Iterable[MemoryDocumentReference], field_paths=None,
+                transaction=None) -> Iterator[MemoryDocumentSnapshot]:
+        self._wait()
+        for ref in references:
+            snap = self._read(ref)
+            if field_paths is not None and snap.exists:
+                snap = MemoryDocumentSnapshot(ref, _project(snap._data, list(field_paths)))
+            yield snap
+
+    def _read(self, ref: MemoryDocumentReference) -> MemoryDocumentSnapshot:
+        with self._lock:
+            doc = self._data.get(ref._collection, {}).get(ref.id)
+            return MemoryDocumentSnapshot(ref, copy.deepcopy(doc))
+
+    def _write(self, ops: List[tuple]) -> None:
+        with self._lock:
+            # validate first so a failing update leaves the whole batch unapplied
+            for kind, ref, _, _ in ops:
+                if kind == "update" and ref.id not in self._data.get(ref._collection, {}):
+                    raise NotFound(f"No document to update: {ref.path}")
+            for kind, ref, data, merge in ops:
+                docs = self._data.setdefault(ref._collection, {})
+                if kind == "delete":
+                    docs.pop(ref.id, None)
+                elif kind == "set" and not merge:
+                    docs[ref.id] = _resolve_transforms(data)
+                elif kind == "set":
+                    _merge(docs.setdefault(ref.id, {}), data)
+                else:
+                    doc = docs[ref.id]
+                    for path, value in data.items():
+                        parts = path.split(".")
+                        cur = doc
+                        for part in parts[:-1]:
+                            if not isinstance(cur.get(part), dict):
+                                cur[part] = {}
+                            cur = cur[part]
+                        _apply(cur, parts[-1], value)
+
+    def load(self, data: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+        """
+        Bulk-load {collection: {doc_id: doc}} (e.g. a fixture for CI).
+        """
+        with self._lock:
+            for name, docs in data.items():
+                self._data.setdefault(name, {}).update(copy.deepcopy(docs))
+
+    def load_json(self, path: str) -> None:
+        with open(path, encoding="utf-8") as f:
+            self.load(json.load(f))
+
+    def dump(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        with self._lock:
+            return copy.deepcopy(self._data)
+
+
+class AsyncMemoryDocumentReference:
+    def __init__(self, aclient: "AsyncMemoryClient", ref: MemoryDocumentReference):
+        self._aclient = aclient
+        self._ref = ref
+        self.id = ref.id
+
+    @property
+    def path(self) -> str:
+        return self._ref.path
+
+    async def get(self, field_paths=None, transaction=None) -> MemoryDocumentSnapshot:
+        await self._aclient._wait()
+        return self._ref._client._read(self._ref)
+
+    async def set(self, document_data: Dict[str, Any], merge: bool = False) -> None:
+        await self._aclient._wait()
+        self._ref._client._write([("set", self._ref, document_data, merge)])
+
+    async def update(self, field_updates: Dict[str, Any]) -> None:
+        await self._aclient._wait()
+        self._ref._client._write([("update", self._ref, field_updates, False)])
+
+    async def delete(self) -> None:
+        await self._aclient._wait()
+        self._ref._client._write([("delete", self._ref, None, False)])
+
+
+class AsyncMemoryQuery:
+    def __init__(self, aclient: "AsyncMemoryClient", query: MemoryQuery):
+        self._aclient = aclient
+        self._query = query
+
+    def where(self, field_path: str, op_string: str, value: Any) -> "AsyncMemoryQuery":
+        return AsyncMemoryQuery(self._aclient, self._query.where(field_path, op_string, value))
+
+    def select(self, field_paths: Iterable[str]) -> "AsyncMemoryQuery":
+        return AsyncMemoryQuery(self._aclient, self._query.select(field_paths))
+
+    def order_by(self, field_path: str, direction: str = "ASCENDING") -> "AsyncMemoryQuery":
+        return AsyncMemoryQuery(self._aclient, self._query.order_by(field_path, direction))
+
+    def start_after(self, document_fields) -> "AsyncMemoryQuery":
+        return AsyncMemoryQuery(self._aclient, self._query.start_after(document_fields))
+
+    def limit(self, count: int) -> "AsyncMemoryQuery":
+        return AsyncMemoryQuery(self._aclient, self._query.limit(count))
+
+    async def stream(self, transaction=None):
+        await self._aclient._wait()
+        for snap in self._query._snapshots():
+            yield snap
+
+    async def get(self, transaction=None) -> List[MemoryDocumentSnapshot]:
+        return [snap async for snap in self.stream()]
+
+
+class AsyncMemoryCollection(AsyncMemoryQuery):
+    def document(self, document_id: Optional[str] = None) -> AsyncMemoryDocumentReference:
+        return AsyncMemoryDocumentReference(self._aclient, self._query.document(document_id))
+
+
+class AsyncMemoryClient:
+    """
+    Async view of a MemoryClient: same documents, latency awaited with asyncio.sleep
+    so many calls can be in flight on one event loop.
+    """
+
+    def __init__(self, client: MemoryClient):
+        self._client = client
+
+    async def _wait(self) -> None:
+        if self._client.latency:
+            await asyncio.sleep(self._client.latency)
+
+    def collection(self, name: str) -> AsyncMemoryCollection:
+        return AsyncMemoryCollection(self, self._client.collection(name))
+
+    async def get_all(self, references: Iterable[AsyncMemoryDocumentReference], field_paths=None,
+                      transaction=None):
+        await self._wait()
+        for ref in references:
+            snap = self._client._read(ref._ref)
+            if field_paths is not None and snap.exists:
+                snap = MemoryDocumentSnapshot(ref._ref, _project(snap._data, list(field_paths)))
+            yield snap
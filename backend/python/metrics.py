@@ -0,0 +1,162 @@
+# backend/python/metrics.py
+"""
+In-process request and stage timing, exposed in Prometheus text format.
+
+init_app() records a latency histogram per route and serves /metrics. Inside a
+handler, `with stage("firestore_read"): ...` times one step of the hot path; stage
+timings go to their own histogram and, when Server-Timing is enabled, into the
+response header so a single slow request can be broken down in the browser.
+Metrics are per worker process.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from flask import Response, g, has_request_context, request
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            # per series: one counter per bucket, then sum and count
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for key, series in items:
+            base = list(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{_labels(base + [('le', repr(bound))])} {int(count)}")
+            lines.append(f"{self.name}_bucket{_labels(base + [('le', '+Inf')])} {int(series[-1])}")
+            lines.append(f"{self.name}_sum{_labels(base)} {series[-2]}")
+            lines.append(f"{self.name}_count{_labels(base)} {int(series[-1])}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram(
+    "page_request_duration_seconds", "Request latency by route.", ("route", "method", "status"))
+STAGE_LATENCY = Histogram(
+    "page_stage_duration_seconds", "Time spent per hot-path stage.", ("stage",))
+
+
+class CacheStats:
+    """
+    Hit, miss and size series for the in-process caches (lru.LRUCache).
+    """
+
+    def __init__(self):
+        self._caches: Dict[str, object] = {}
+
+    def add(self, name: str, cache) -> None:
+        self._caches[name] = cache
+
+    def render(self) -> List[str]:
+        lines = []
+        for metric, attr, kind, doc in (
+            ("page_cache_hits_total", "hits", "counter", "Cache hits."),
+            ("page_cache_misses_total", "misses", "counter", "Cache misses."),
+            ("page_cache_entries", "__len__", "gauge", "Entries currently cached."),
+        ):
+            lines += [f"# HELP {metric} {doc}", f"# TYPE {metric} {kind}"]
+            for name, cache in sorted(self._caches.items()):
+                value = len(cache) if attr == "__len__" else getattr(cache, attr)
+                lines.append(f"{metric}{_labels([('cache', name)])} {value}")
+        return lines
+
+
+CACHES = CacheStats()
+
+_collectors = [REQUEST_LATENCY, STAGE_LATENCY, CACHES]
+
+
+def register(collector) -> None:
+    """
+    Add anything with a render() -> list of lines to the /metrics output.
+    """
+    _collectors.append(collector)
+
+
+def register_cache(name: str, cache) -> None:
+    """
+    Export a cache's hit/miss counters and size under cache="<name>".
+    """
+    CACHES.add(name, cache)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_LATENCY.observe(elapsed, stage=name)
+        if has_request_context() and hasattr(g, "_stage_timings"):
+            g._stage_timings[name] = g._stage_timings.get(name, 0.0) + elapsed
+
+
+def render() -> str:
+    lines: List[str] = []
+    for collector in _collectors:
+        lines.extend(collector.render())
+    return "\n".join(lines) + "\n"
+
+
+def init_app(app, server_timing: bool = False) -> None:
+    """
+    Time every request, serve /metrics, and optionally add a Server-Timing header.
+    """
+    @app.before_request
+    def _start_timer():
+        g._request_start = time.perf_counter()
+        g._stage_timings = {}
+
+    @app.after_request
+    def _record(response):
+        start = getattr(g, "_request_start", None)
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        REQUEST_LATENCY.observe(elapsed, route=route, method=request.method, status=response.status_code)
+        if server_timing:
+            parts = [f"{name};dur={secs * 1000:.2f}" for name, secs in g._stage_timings.items()]
+            parts.append(f"total;dur={elapsed * 1000:.2f}")
+            response.headers["Server-Timing"] = ", ".join(parts)
+        return response
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(render(), mimetype="text/plain; version=0.0.4")
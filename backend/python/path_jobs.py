@@ -0,0 +1,222 @@
+# backend/python/path_jobs.py
+"""
+Stored learning paths and the background job that refreshes them.
+
+Each student doc can carry a "path" map: the recommended topic ids together with
+the mastered set, limit and graph (the snapshot graph_tag, a hash of the graph
+structure that is the same in every worker) they were computed for. A stored path
+is served only while all three still match, so curriculum changes made anywhere
+(other workers, sync_topics, the node backend, a lost job) never serve a stale
+path; at worst the path is recomputed on read. Title and description edits leave
+the graph, and so every stored path, valid.
+
+After a topic edit or delete, PathJobRunner recomputes the stored path of every
+student the change can affect: students whose mastered list contains the topic,
+one of its old or new prerequisites, or one of its descendants (they move with
+the topic in topological order, which can change a truncated path). When the
+topic starts or stops being a starting topic (no prerequisites), or more than
+FULL_REFRESH_TOPICS topics are touched, every student is refreshed. Results are
+written through chunked batches and each job reports its progress. Jobs run one
+at a time on a background thread of the worker that made the edit.
+"""
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import networkx as nx
+
+PATH_FIELD = "path"
+# array-contains-any takes at most this many values per query
+ANY_QUERY_LIMIT = 10
+# only these fields are needed to work out a student's mastered set
+STUDENT_FIELDS = ["mastered", "scores", "finals", "final"]
+# past this many touched topics one full scan is cheaper than the array-contains-any queries
+FULL_REFRESH_TOPICS = 200
+
+
+def path_record(mastered: Iterable[str], recommended: List[str], limit: int, graph: str) -> Dict[str, Any]:
+    """
+    Value stored under the student's "path" field; graph is the snapshot graph_tag.
+    """
+    return {
+        "recommended": list(recommended),
+        "mastered": sorted(set(mastered)),
+        "limit": limit,
+        "graph": graph,
+        "computed_at": datetime.utcnow().isoformat(),
+    }
+
+
+def stored_path(student: Dict[str, Any], mastered: Iterable[str], limit: int,
+                graph: str) -> Optional[List[str]]:
+    """
+    Recommended ids from the student's stored path, or None when there is none or it
+    was computed for a different mastered set, limit or graph.
+    """
+    record = student.get(PATH_FIELD)
+    if not isinstance(record, dict) or record.get("limit") != limit:
+        return None
+    if record.get("graph") != graph:
+        return None
+    if set(record.get("mastered") or []) != set(mastered):
+        return None
+    recommended = record.get("recommended")
+    return list(recommended) if isinstance(recommended, list) else None
+
+
+class PathJob:
+    def __init__(self, topic_id: Optional[str], old_prereqs: Optional[Set[str]], was_root: bool):
+        self.id = uuid.uuid4().hex[:12]
+        self.topic_id = topic_id
+        self.old_prereqs = set(old_prereqs or ())
+        self.was_root = was_root
+        self.status = "queued"
+        self.full = None
+        self.total = 0
+        self.processed = 0
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "topic_id": self.topic_id,
+            "status": self.status,
+            "full": self.full,
+            "total": self.total,
+            "processed": self.processed,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class PathJobRunner:
+    """
+    snapshot() -> current CurriculumSnapshot; mastered_of(student doc) -> mastered ids;
+    recommend(snap, mastered, limit) -> recommended ids.
+    """
+
+    def __init__(self, db, snapshot: Callable[[], Any], mastered_of: Callable[[Dict[str, Any]], List[str]],
+                 recommend: Callable[[Any, List[str], int], List[str]], limit: int = 10,
+                 chunk_size: int = 400, keep: int = 50):
+        self.db = db
+        self.limit = limit
+        self.chunk_size = chunk_size
+        self._snapshot = snapshot
+        self._mastered_of = mastered_of
+        self._recommend = recommend
+        self._keep = keep
+        self._jobs: Dict[str, PathJob] = {}
+        self._queue: "queue.Queue[PathJob]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, topic_id: str, old_prereqs: Optional[Set[str]], was_root: bool) -> PathJob:
+        """
+        Queue a refresh for a change to topic_id. old_prereqs is None when the topic
+        did not exist before the change.
+        """
+        job = PathJob(topic_id, old_prereqs, was_root)
+        with self._lock:
+            self._jobs[job.id] = job
+            # forget the oldest finished jobs
+            finished = [j for j in self._jobs.values() if j.finished_at is not None]
+            for old in sorted(finished, key=lambda j: j.created_at)[:max(0, len(self._jobs) - self._keep)]:
+                del self._jobs[old.id]
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._work, name="path-jobs", daemon=True)
+                self._thread.start()
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[PathJob]:
+        return self._jobs.get(job_id)
+
+    def recent(self) -> List[PathJob]:
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda j: j.created_at, reverse=True)
+
+    def refresh_all(self) -> PathJob:
+        """
+        Recompute every student's stored path now, on the calling thread (used by
+        sync_topics, which has no worker to hand the job to).
+        """
+        job = PathJob(None, None, False)
+        job.full = True
+        self._execute(job)
+        return job
+
+    def _work(self) -> None:
+        while True:
+            self._execute(self._queue.get())
+
+    def _execute(self, job: PathJob) -> None:
+        job.status, job.started_at = "running", time.time()
+        try:
+            self._run(job)
+            job.status = "done"
+        except Exception as e:
+            print("path job error:", e)
+            job.status, job.error = "failed", str(e)
+        job.finished_at = time.time()
+
+    def _affected(self, touched: Set[str], full: bool):
+        students = self.db.students.select(STUDENT_FIELDS)
+        if full:
+            return list(students.stream())
+        found = {}
+        ids = sorted(touched)
+        for start in range(0, len(ids), ANY_QUERY_LIMIT):
+            query = students.where("mastered", "array-contains-any", ids[start:start + ANY_QUERY_LIMIT])
+            for d in query.stream():
+                found[d.id] = d
+        return list(found.values())
+
+    def _run(self, job: PathJob) -> None:
+        snap = self._snapshot()
+        G = snap.graph
+        topic = job.topic_id
+        new_prereqs = set(G.predecessors(topic)) if topic in G else set()
+        is_root = topic in G and not new_prereqs
+        touched = {topic} | job.old_prereqs | new_prereqs
+        if topic in G:
+            # a deleted topic still has its children as descendants while they name it
+            touched |= nx.descendants(G, topic)
+        if job.full is None:
+            job.full = job.was_root != is_root or len(touched) > FULL_REFRESH_TOPICS
+
+        students = self._affected(touched, job.full)
+        graph = snap.graph_tag
+        job.total = len(students)
+
+        for start in range(0, len(students), self.chunk_size):
+            chunk = students[start:start + self.chunk_size]
+            updates = []
+            for d in chunk:
+                mastered = self._mastered_of(d.to_dict() or {})
+                recommended = self._recommend(snap, mastered, self.limit)
+                updates.append((d.reference, {PATH_FIELD: path_record(mastered, recommended, self.limit, graph)}))
+            self._write(updates)
+            job.processed += len(chunk)
+
+    def _write(self, updates) -> None:
+        # update() rather than set() so a student deleted meanwhile is not recreated
+        batch = self.db.batch()
+        for ref, data in updates:
+            batch.update(ref, data)
+        try:
+            batch.commit()
+        except self.db.NotFound:
+            # the batch failed as a whole; write the rest one by one
+            for ref, data in updates:
+                try:
+                    ref.update(data)
+                except self.db.NotFound:
+                    pass
@@ -1,14 +1,14 @@
 # reset_topics.py
-from firestore_client import get_client
+from storage import get_storage
+import sync_topics
 
-db = get_client()
+db = get_storage()
 
 def clear_topics():
-    topics_ref = db.collection("topics")
-    docs = topics_ref.stream()
-    for doc in docs:
-        doc.reference.delete()
-    print("✅ All topics deleted from Firestore.")
+    # delete through batched commits rather than one round trip per doc
+    ids = [doc.id for doc in db.topics.select([]).stream()]
+    sync_topics.apply_changes(db, {}, ids)
+    print(f"✅ All topics deleted from Firestore ({len(ids)}).")
 
 if __name__ == "__main__":
     clear_topics()
@@ -1,11 +1,5 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
-
-# Initialize Firestore
-cred = credentials.Certificate("serviceAccountKey.json")
-firebase_admin.initialize_app(cred)
-db = firestore.client()
-
+# backend/python/seed_topics.py
+# The bundled curriculum. Keep `topics` a plain literal: sync_topics reads it with ast.
 topics = [
 
     # -------------------- DECIMALS CLUSTER --------------------
@@ -207,8 +201,8 @@ topics = [
 
 ]
 
-# Insert into Firestore
-for topic in topics:
-    db.collection("topics").document(topic["id"]).set(topic)
-
-print("Topics seeded successfully!")
+# Sync into the topics collection (writes only what changed)
+if __name__ == "__main__":
+    import sys
+    import sync_topics
+    sys.exit(sync_topics.main([__file__] + sys.argv[1:]))
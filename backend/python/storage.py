@@ -0,0 +1,172 @@
+# backend/python/storage.py
+"""
+Storage layer for the backend.
+
+Storage wraps a Firestore-style client and names the collections the app works
+with, so handlers say db.students / db.topics instead of db.collection("...").
+The client is picked by PAGE_STORAGE:
+  - "firestore" (default): the real client from firestore_client.get_client()
+  - "memory": memory_store.MemoryClient, for offline profiling, load tests and CI.
+    PAGE_MEMORY_SEED points at a JSON fixture {collection: {doc_id: doc}} to preload,
+    PAGE_MEMORY_LATENCY_MS adds a fixed delay per call.
+get_async_storage() gives the matching async client (Firestore AsyncClient or
+memory_store.AsyncMemoryClient over the same data) for the async serving mode.
+Both clients share the same stream/where/get/set(merge=True)/batch/transaction/
+count() semantics; field transforms come from the backend in use via increment()/
+array_union(), and update() on a missing doc raises db.NotFound.
+
+The Firestore client (and the firebase_admin / grpc imports behind it) is created
+on first use rather than at import, so a worker starts serving without paying for it.
+"""
+import os
+import threading
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+
+class Storage:
+    """
+    Either pass client/transforms/not_found directly, or a connect() returning that
+    triple, which is called once on first access.
+    """
+
+    def __init__(self, client=None, transforms=None, backend: str = "firestore", not_found=Exception,
+                 connect: Optional[Callable[[], Tuple[Any, Any, type]]] = None):
+        self._client = client
+        self._transforms = transforms
+        self._not_found = not_found
+        self._connect = connect
+        self._lock = threading.Lock()
+        self.backend = backend
+
+    def _ensure_client(self) -> None:
+        with self._lock:
+            if self._client is None:
+                self._client, self._transforms, self._not_found = self._connect()
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._ensure_client()
+        return self._client
+
+    @property
+    def connected(self) -> bool:
+        return self._client is not None
+
+    @property
+    def NotFound(self):
+        if self._client is None:
+            self._ensure_client()
+        return self._not_found
+
+    # collections
+    @property
+    def students(self):
+        return self.client.collection("students")
+
+    @property
+    def topics(self):
+        return self.client.collection("topics")
+
+    @property
+    def contents(self):
+        return self.client.collection("contents")
+
+    @property
+    def users(self):
+        return self.client.collection("users")
+
+    @property
+    def meta(self):
+        return self.client.collection("meta")
+
+    def collection(self, name: str):
+        return self.client.collection(name)
+
+    # multi-document operations
+    def get_all(self, references: Iterable[Any], field_paths: Optional[Iterable[str]] = None):
+        references = list(references)
+        if not references:
+            return []
+        return self.client.get_all(references, field_paths=field_paths)
+
+    def batch(self):
+        return self.client.batch()
+
+    def count(self, query) -> int:
+        """
+        Number of documents matching query, counted server-side (one aggregation read).
+        """
+        return int(query.count().get()[0][0].value)
+
+    def transaction(self):
+        return self.client.transaction()
+
+    def transactional(self, fn):
+        """
+        Wrap fn(transaction, ...) to run inside a transaction (retried on contention
+        by Firestore, so fn must only read through the transaction and not have side effects).
+        """
+        return self._module().transactional(fn)
+
+    # field transforms
+    def _module(self):
+        if self._client is None:
+            self._ensure_client()
+        return self._transforms
+
+    def increment(self, value):
+        return self._module().Increment(value)
+
+    def array_union(self, values: Iterable[Any]):
+        return self._module().ArrayUnion(list(values))
+
+
+class AsyncStorage(Storage):
+    """
+    Storage over an async client: document get()/set() and stream() are awaited.
+    """
+
+    async def get_all(self, references: Iterable[Any], field_paths: Optional[Iterable[str]] = None):
+        references = list(references)
+        if not references:
+            return []
+        return [snap async for snap in self.client.get_all(references, field_paths=field_paths)]
+
+
+def get_async_storage(storage: Storage) -> AsyncStorage:
+    """
+    Async counterpart of storage, on the same backend (for memory, the same documents).
+    """
+    if storage.backend == "memory":
+        import memory_store
+        return AsyncStorage(memory_store.AsyncMemoryClient(storage.client), memory_store,
+                            storage.backend, not_found=storage.NotFound)
+
+    def connect():
+        from google.cloud import firestore
+        from firestore_client import get_async_client
+        return get_async_client(), firestore, storage.NotFound
+
+    return AsyncStorage(backend=storage.backend, connect=connect)
+
+
+def _connect_firestore():
+    from google.api_core.exceptions import NotFound
+    from google.cloud import firestore
+    from firestore_client import get_client
+    return get_client(), firestore, NotFound
+
+
+def get_storage(backend: Optional[str] = None) -> Storage:
+    backend = (backend or os.getenv("PAGE_STORAGE") or "firestore").lower()
+    if backend == "memory":
+        import memory_store
+        client = memory_store.MemoryClient(latency=float(os.getenv("PAGE_MEMORY_LATENCY_MS", 0) or 0) / 1000)
+        seed = os.getenv("PAGE_MEMORY_SEED")
+        if seed:
+            client.load_json(seed)
+        return Storage(client, memory_store, backend, not_found=memory_store.NotFound)
+    if backend == "firestore":
+        return Storage(backend=backend, connect=_connect_firestore)
+    raise ValueError(f"Unknown PAGE_STORAGE backend: {backend}")
@@ -0,0 +1,240 @@
+# backend/python/sync_topics.py
+"""
+Sync the topics collection with a curriculum file.
+
+Run from backend/python:
+    python sync_topics.py                          # seed_topics.py, the bundled curriculum
+    python sync_topics.py curriculum.json --dry-run
+    python sync_topics.py curriculum.json --keep-missing
+    python sync_topics.py curriculum.json --export curriculum.snap
+
+The file is either JSON (a list of topic docs with "id", or {topic_id: doc}) or a
+Python module with a literal `topics = [...]` list like seed_topics.py (read with
+ast, not imported). It is diffed against the stored topics; only new, changed and
+removed documents are written, through batches of BATCH_SIZE. New and changed docs
+are written before removals so the graph students see never goes empty. The
+resulting curriculum is validated with graph_service first and nothing is written
+when it has cycles or unknown prerequisites. Applying moves the stored curriculum
+version, so running workers rebuild their graph within CURRICULUM_VERSION_CHECK
+seconds and stop serving older snapshot files; --export writes a new one. Every
+student's stored path (see path_jobs) is then recomputed against the synced
+curriculum unless --no-refresh-paths is given.
+"""
+import argparse
+import ast
+import json
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import curriculum_snapshot
+import path_jobs
+from curriculum_cache import CurriculumSnapshot
+from graph_service import CurriculumIndex, build_graph_from_topics, validate_dag
+from mastery import student_mastered
+
+DEFAULT_SOURCE = "seed_topics.py"
+# Firestore allows 500 writes per batch
+BATCH_SIZE = 400
+MAX_REPORTED_CYCLES = 5
+
+
+def load_curriculum(path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    {topic_id: doc} from a JSON file or a Python file assigning a literal `topics` list.
+    Docs are stored as given (seed_topics keeps "id" inside the doc too).
+    """
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if path.endswith(".py"):
+        data = _literal_topics(text, path)
+    else:
+        data = json.loads(text)
+    if isinstance(data, dict):
+        return {tid: dict(doc) for tid, doc in data.items()}
+    out = {}
+    for doc in data:
+        if not doc.get("id"):
+            raise ValueError(f"{path}: topic without an id: {doc}")
+        out[doc["id"]] = dict(doc)
+    return out
+
+
+def _literal_topics(source: str, path: str):
+    for node in ast.parse(source, filename=path).body:
+        if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "topics" for t in node.targets):
+            return ast.literal_eval(node.value)
+    raise ValueError(f"{path}: no literal `topics = [...]` assignment")
+
+
+def current_topics(db) -> Dict[str, Dict[str, Any]]:
+    return {d.id: d.to_dict() or {} for d in db.topics.stream()}
+
+
+def diff(current: Dict[str, Dict[str, Any]],
+         desired: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, Dict[str, Any]], List[str], List[str]]:
+    """
+    Return (writes, added, removed): writes holds every new or changed doc by id,
+    added the ids among them that are new, removed the stored ids not in desired.
+    """
+    writes = {tid: doc for tid, doc in desired.items() if current.get(tid) != doc}
+    added = sorted(tid for tid in writes if tid not in current)
+    removed = sorted(tid for tid in current if tid not in desired)
+    return writes, added, removed
+
+
+def validate(desired: Dict[str, Dict[str, Any]]) -> List[str]:
+    """
+    Problems with the curriculum as a whole; empty when it can be applied.
+    """
+    problems = []
+    for tid, doc in sorted(desired.items()):
+        prereqs = doc.get("prerequisites") or []
+        if not isinstance(prereqs, list):
+            problems.append(f"{tid}: prerequisites must be a list")
+            continue
+        for p in prereqs:
+            if p not in desired:
+                problems.append(f"{tid}: unknown prerequisite {p}")
+    G = build_graph_from_topics([{**doc, "id": tid} for tid, doc in desired.items()])
+    for cycle in validate_dag(G, max_cycles=MAX_REPORTED_CYCLES) or []:
+        problems.append("cycle: " + " -> ".join(cycle + cycle[:1]))
+    return problems
+
+
+def apply_changes(db, writes: Dict[str, Dict[str, Any]], removed: Iterable[str],
+                  batch_size: int = BATCH_SIZE) -> int:
+    """
+    Write changed docs (full replace), then delete removed ones, batch_size writes
+    per commit. The stored curriculum version is bumped in the last commit.
+    Returns the number of commits.
+    """
+    ops = [("set", tid, doc) for tid, doc in sorted(writes.items())]
+    ops += [("delete", tid, None) for tid in removed]
+    commits = 0
+    # one slot per commit stays free for the version bump
+    step = max(1, batch_size - 1)
+    for start in range(0, len(ops), step):
+        batch = db.batch()
+        for op, tid, doc in ops[start:start + step]:
+            ref = db.topics.document(tid)
+            if op == "set":
+                batch.set(ref, doc)
+            else:
+                batch.delete(ref)
+        if start + step >= len(ops):
+            curriculum_snapshot.bump_version(db, batch)
+        batch.commit()
+        commits += 1
+    return commits
+
+
+def refresh_paths(db) -> path_jobs.PathJob:
+    """
+    Recompute every stored student path against the topics as stored now.
+    """
+    # loaded like app._load_topic_docs so the graph_tag stored with each path matches the workers'
+    docs = [{"id": d.id, **d.to_dict()} for d in db.topics.stream()]
+    snap = CurriculumSnapshot(0, docs, build_graph_from_topics(docs))
+
+    def recommend(s, mastered, limit):
+        return s.derive("index", lambda s: CurriculumIndex(s.graph)).recommend(mastered, limit=limit)
+
+    runner = path_jobs.PathJobRunner(db, lambda: snap, student_mastered, recommend, chunk_size=BATCH_SIZE)
+    return runner.refresh_all()
+
+
+def sync(db, desired: Dict[str, Dict[str, Any]], dry_run: bool = False, keep_missing: bool = False,
+         paths: bool = True, out=print) -> Optional[Dict[str, Any]]:
+    """
+    Diff, validate and (unless dry_run) apply, then refresh stored paths when paths
+    is set; returns a summary, or None when validation failed and nothing was written.
+    """
+    timings = {}
+    t = time.perf_counter()
+    current = current_topics(db)
+    timings["read"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    writes, added, removed = diff(current, desired)
+    unchanged = len(desired) - len(writes)
+    if keep_missing:
+        # validate what will actually be stored
+        desired = {**{tid: current[tid] for tid in removed}, **desired}
+        removed = []
+    timings["diff"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    problems = validate(desired)
+    timings["validate"] = time.perf_counter() - t
+
+    summary = {
+        "stored": len(current),
+        "added": len(added),
+        "changed": len(writes) - len(added),
+        "removed": len(removed),
+        "unchanged": unchanged,
+        "commits": 0,
+        "dry_run": dry_run,
+    }
+    for tid in added:
+        out(f"  + {tid}")
+    for tid in sorted(set(writes) - set(added)):
+        out(f"  ~ {tid}")
+    for tid in removed:
+        out(f"  - {tid}")
+    if problems:
+        for p in problems:
+            out(f"  ! {p}")
+        out(f"❌ Curriculum is invalid ({len(problems)} problem(s)); nothing written.")
+        return None
+
+    if not dry_run and (writes or removed):
+        t = time.perf_counter()
+        summary["commits"] = apply_changes(db, writes, removed)
+        timings["apply"] = time.perf_counter() - t
+        if paths:
+            t = time.perf_counter()
+            job = refresh_paths(db)
+            if job.error:
+                out(f"  ! stored path refresh failed: {job.error}")
+            summary["paths_refreshed"] = job.processed
+            timings["paths"] = time.perf_counter() - t
+
+    summary["timings_ms"] = {k: round(v * 1000, 1) for k, v in timings.items()}
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", nargs="?", default=DEFAULT_SOURCE, help="curriculum file (.json or .py)")
+    parser.add_argument("--dry-run", action="store_true", help="show the diff without writing")
+    parser.add_argument("--keep-missing", action="store_true", help="do not delete stored topics missing from the file")
+    parser.add_argument("--export", metavar="PATH", help="write a curriculum snapshot file afterwards")
+    parser.add_argument("--no-refresh-paths", action="store_true", help="do not recompute stored student paths")
+    args = parser.parse_args(argv)
+
+    t = time.perf_counter()
+    desired = load_curriculum(args.source)
+    load_ms = (time.perf_counter() - t) * 1000
+
+    from storage import get_storage
+    db = get_storage()
+    summary = sync(db, desired, dry_run=args.dry_run, keep_missing=args.keep_missing,
+                   paths=not args.no_refresh_paths)
+    if summary is None:
+        return 1
+    summary["timings_ms"] = {"load": round(load_ms, 1), **summary["timings_ms"]}
+    if args.export and not args.dry_run:
+        t = time.perf_counter()
+        print("✅ Curriculum snapshot written:", curriculum_snapshot.export(db, args.export))
+        summary["timings_ms"]["export"] = round((time.perf_counter() - t) * 1000, 1)
+    label = "Dry run" if args.dry_run else "Topics synced"
+    print(f"✅ {label}: " + ", ".join(f"{k}={summary[k]}" for k in ("added", "changed", "removed", "unchanged", "commits", "paths_refreshed")
+                                   if k in summary))
+    print("   timings (ms): " + ", ".join(f"{k}={v}" for k, v in summary["timings_ms"].items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+# backend/python/tests/test_graph_service.py
+"""
+Regression tests for the nearest-remaining-path search (step 3 of the
+recommendation strategy) against the per-pair has_path/shortest_path scan it
+replaced.
+
+Step 3 cannot be reached through recommend_next_topics on a DAG (step 1 always
+finds an unlocked topic while any topic is unmastered), so both implementations
+are called directly.
+
+The old scan takes the fewest-edges path from each mastered topic and keeps the
+first one (in topological order of targets, set order of sources) with the
+fewest unmastered topics. When several paths tie it depends on set iteration
+order, so the comparison is on what is deterministic: the number of remaining
+topics, the target, and that the returned sequence is a real path. When the best
+path is unique the outputs must be identical.
+"""
+import random
+
+import networkx as nx
+import pytest
+
+from graph_service import CurriculumIndex, _nearest_remaining_path, build_graph_from_topics, recommend_next_topics
+
+
+def old_nearest_remaining_path(G, topo, mastered_set):
+    # step 3 of recommend_next_topics before the multi-source search
+    best_path = None
+    best_len = None
+    for target in [n for n in topo if n not in mastered_set]:
+        for m in mastered_set:
+            if nx.has_path(G, m, target):
+                path = nx.shortest_path(G, source=m, target=target)
+                remaining = [p for p in path if p not in mastered_set]
+                if not remaining:
+                    continue
+                if best_len is None or len(remaining) < best_len:
+                    best_len = len(remaining)
+                    best_path = remaining
+    return best_path
+
+
+def random_dag(seed):
+    rng = random.Random(seed)
+    n = rng.randint(2, 30)
+    labels = [f"t{i:02d}" for i in range(n)]
+    rng.shuffle(labels)
+    density = rng.choice([0.05, 0.15, 0.3])
+    G = nx.DiGraph()
+    G.add_nodes_from(labels)
+    for i in range(n):
+        for j in range(i + 1, n):
+            if rng.random() < density:
+                G.add_edge(labels[i], labels[j])
+    mastered = {t for t in labels if rng.random() < rng.choice([0.2, 0.5, 0.8])}
+    return G, mastered
+
+
+def is_remaining_sequence(G, mastered_set, path):
+    # starts one step past a mastered topic; consecutive topics are joined through mastered ones only
+    starts = any(G.has_edge(m, path[0]) for m in mastered_set)
+    return starts and all(
+        nx.has_path(G.subgraph(mastered_set | {a, b}), a, b)
+        for a, b in zip(path, path[1:])
+    )
+
+
+def unique_best(G, topo, mastered_set, expected):
+    # True when no other source/path gives the same number of remaining topics to the target
+    target = expected[-1]
+    count = 0
+    for m in mastered_set:
+        for path in nx.all_simple_paths(G, m, target):
+            if len([p for p in path if p not in mastered_set]) == len(expected):
+                count += 1
+                if count > 1:
+                    return False
+    return count == 1
+
+
+SEEDS = range(300)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_nearest_remaining_path_matches_old_scan(seed):
+    G, mastered = random_dag(seed)
+    topo = list(nx.topological_sort(G))
+    expected = old_nearest_remaining_path(G, topo, mastered)
+    got = _nearest_remaining_path(G, topo, mastered)
+
+    if expected is None:
+        assert got is None
+        return
+    assert got is not None
+    assert len(got) == len(expected)
+    assert got[-1] == expected[-1]
+    assert not set(got) & mastered
+    assert is_remaining_sequence(G, mastered, got)
+    if unique_best(G, topo, mastered, expected):
+        assert got == expected
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_curriculum_index_nearest_path_matches_module_function(seed):
+    G, mastered = random_dag(seed)
+    index = CurriculumIndex(G)
+    topo = list(index.order)
+    mastered_ids = {index.ids[t] for t in mastered}
+
+    got = index._nearest_remaining_path(mastered_ids)
+    expected = _nearest_remaining_path(G, topo, mastered)
+    if expected is None:
+        assert got is None
+    else:
+        assert [index.order[i] for i in got] == expected
+
+    old = old_nearest_remaining_path(G, topo, mastered)
+    if old is None:
+        assert got is None
+    else:
+        assert len(got) == len(old)
+        assert index.order[got[-1]] == old[-1]
+
+
+@pytest.mark.parametrize("limit", [-3, -1, 0, 1, 2, 10])
+def test_curriculum_index_recommend_matches_recommend_next_topics(limit):
+    for seed in range(200):
+        G, mastered = random_dag(seed)
+        assert CurriculumIndex(G).recommend(mastered, limit=limit) == recommend_next_topics(G, mastered, limit=limit), seed
+
+
+def test_step_three_starts_past_mastered_topics():
+    # a -> b -> c -> d with b mastered: the remaining sequence skips b
+    G = nx.DiGraph([("a", "b"), ("b", "c"), ("c", "d"), ("a", "x")])
+    topo = list(nx.topological_sort(G))
+    mastered = {"b", "x"}
+    assert _nearest_remaining_path(G, topo, mastered) == old_nearest_remaining_path(G, topo, mastered) == ["c"]
+
+
+def test_no_reachable_target():
+    G = nx.DiGraph([("a", "b")])
+    G.add_node("z")
+    topo = list(nx.topological_sort(G))
+    assert _nearest_remaining_path(G, topo, {"b"}) is None
+    assert old_nearest_remaining_path(G, topo, {"b"}) is None
+
+
+def test_null_prerequisites_build_a_root_topic():
+    G = build_graph_from_topics([{"id": "a"}, {"id": "b", "prerequisites": None}, {"id": "c", "prerequisites": ["a"]}])
+    assert set(G.edges) == {("a", "c")}
+    assert G.nodes["b"]["prerequisites"] == []
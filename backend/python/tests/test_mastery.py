@@ -0,0 +1,58 @@
+# backend/python/tests/test_mastery.py
+"""
+compute_mastered_batch against compute_mastered_from_scores, the per-student
+function it batches: both must skip the same missing and non-numeric values.
+"""
+import random
+
+import pytest
+
+from mastery import compute_mastered_batch, compute_mastered_from_scores
+
+ODD_VALUES = [None, "abc", "", " 7 ", "9", float("nan"), float("inf"), True, False, 0, -3, [1, 2], {"a": 1}]
+
+
+def random_value(rng):
+    if rng.random() < 0.3:
+        return rng.choice(ODD_VALUES)
+    return rng.choice([rng.randint(0, 100), rng.uniform(0, 100)])
+
+
+def random_students(seed, n=40):
+    rng = random.Random(seed)
+    topics = [f"t{i}" for i in range(rng.randint(1, 12))]
+    students = []
+    for _ in range(n):
+        # some students share topic columns (one block), others do not
+        keys = topics if rng.random() < 0.5 else rng.sample(topics, rng.randint(0, len(topics)))
+        scores = {k: random_value(rng) for k in keys}
+        if rng.random() < 0.1:
+            finals = None
+        else:
+            # finals may miss topics or hold zeros
+            finals = {k: rng.choice([0, random_value(rng)]) for k in keys if rng.random() < 0.8}
+        students.append((scores, finals))
+    thresholds = [rng.choice([0.0, 0.3, 0.5, 0.75, 1.0]) for _ in range(n)]
+    return students, thresholds
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_batch_matches_per_student_function(seed):
+    students, thresholds = random_students(seed)
+    expected = [compute_mastered_from_scores(sc, fi, thr) for (sc, fi), thr in zip(students, thresholds)]
+    assert compute_mastered_batch(students, thresholds) == expected
+
+
+@pytest.mark.parametrize("score, final", [
+    (None, 10), ("abc", 10), (float("nan"), 10), (5, None), (5, "abc"), (5, float("nan")),
+    (5, 0), (True, 1), (False, 1), (True, True), ("5", "10"), (5, 10), (4.9, 10),
+])
+def test_single_values(score, final):
+    scores, finals = {"a": score}, {"a": final}
+    assert compute_mastered_batch([(scores, finals)]) == [compute_mastered_from_scores(scores, finals)]
+
+
+def test_missing_finals_and_per_student_thresholds():
+    students = [({"a": 6, "b": 6}, {"a": 10}), ({"a": 6}, None), ({"a": 6, "b": 6}, {"a": 10, "b": 10})]
+    assert compute_mastered_batch(students, [0.5, 0.5, 0.7]) == [["a"], [], []]
+    assert compute_mastered_batch(students, 0.5) == [["a"], [], ["a", "b"]]
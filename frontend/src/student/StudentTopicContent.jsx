@@ -437,7 +437,9 @@ export default function StudentTopicContent() {
         body: JSON.stringify({ content_id: contentId }),
       });
       const data = await res.json();
-      setSeen(data.content_seen || []);
+      // the server only returns the full list in transactional mode
+      if (Array.isArray(data.content_seen)) setSeen(data.content_seen);
+      else if (res.ok) setSeen((prev) => (prev.includes(contentId) ? prev : [...prev, contentId]));
       return data;
     } catch (err) {
       console.error("markSeen failed:", err);